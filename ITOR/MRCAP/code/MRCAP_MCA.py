@@ -1,7 +1,5 @@
 import sys
 import os
-import ast
-from collections import Counter
 import time
 import numpy as np
 from PIL import Image, ImageDraw
@@ -14,15 +12,29 @@ _OUTPUT_DIR = os.path.abspath(os.path.join(_SCRIPT_DIR, '..', 'output'))
 _NFP_DIR = os.path.abspath(os.path.join(_SCRIPT_DIR, 'NFPs'))
 sys.path.insert(0, _UTILS_DIR)
 from botao import Botao
-from nfp_teste import combinar_poligonos, triangulate_shapely, NoFitPolygon, interpolar_pontos_poligono
+from nfp_teste import combinar_poligonos, triangulate_shapely, NoFitPolygon, interpolar_pontos_poligono, no_fit_polygon_lote, nfp_convolucao
+from nfp_tabela import RegistroPecas, tabela_por_tipos
+from nfp_tabela import calcular_tabela_paralela, caminho_checkpoint
+from nfp_tabela import TabelaNFPSimetrica, chaves_canonicas, rotacoes_simetricas
+from nfp_tabela import ProvedorNFP, CacheNFP, diferenca_pecas, rotacionar_peca
+from nfp_tabela import GeometriasNFP
+from cache_layouts import TrieLayouts, zobrist
+from cache_limitado import CacheLimitado
+from geometria_pecas import GeometriaPecas, areas_restantes
+from raster_pecas import MotorRaster
+from regras_posicionamento import avaliar_regras
+from avaliacao_lote import AvaliadorLote
+from cache_custos import CacheCustos, impressao_digital, chave_solucao
 from RKO_v3 import RKO
-from shapely import intersection_all
+from shapely import intersection_all, STRtree
 import shapely
 from shapely import Polygon, MultiPolygon, unary_union, LineString, MultiLineString, MultiPoint, LinearRing, GeometryCollection, Point
 from shapely.prepared import prep
 import itertools
+from functools import partial
 from scipy.spatial import ConvexHull
 import copy
+from bisect import bisect_left
 from matplotlib.patches import Polygon as MPolygon, Rectangle
 import random
 from typing import List, Tuple, Union
@@ -335,26 +347,72 @@ def dimensions(dataset: str):
     return specs.get(dataset, (None, None, None, None))
 
 
-def pre_processar_NFP(rotacoes, lista_pecas, offset, env):
-    tabela_nfps = {}
-    lista_unica = []
-    for peca in lista_pecas:
-
-        if peca not in lista_unica:
-            lista_unica.append(peca)
-    total = len(lista_unica) * len(rotacoes) * len(lista_unica) * len(rotacoes)
-    atual = 0
-    for pecaA in lista_unica:
-        for grauA in rotacoes:
-            for pecaB in lista_unica:
-                for grauB in rotacoes:
-                    atual += 1
-                    porcentagem = (atual / total) * 100
-                    print(f"\rPré-processando NFPs: {porcentagem:.1f}% concluído", end="")
-                    chave = (tuple(pecaA), grauA, tuple(pecaB), grauB)
-                    nfp, intersec = NFP(pecaA, grauA, pecaB, grauB, env)
-                    nfp = nfp.buffer(25)
-                    tabela_nfps[chave] = [list(nfp.exterior.coords),intersec]
+VERSAO_NFP = 'nfp-1-buffer25'
+
+
+def entrada_NFP(pecaA, grauA, pecaB, grauB, env=None, motor=None):
+    nfp = None
+
+    if motor == 'convolucao':
+        nfp, intersec = nfp_convolucao(rotacionar_peca(pecaA, grauA), rotacionar_peca(pecaB, grauB))
+
+    if nfp is None:
+        nfp, intersec = NFP(pecaA, grauA, pecaB, grauB, env)
+    nfp = nfp.buffer(25)
+
+    if nfp.interiors:
+        return [list(nfp.exterior.coords),intersec,[list(buraco.coords) for buraco in nfp.interiors]]
+    return [list(nfp.exterior.coords),intersec]
+
+
+_PECAS_NFP = None
+_MOTOR_NFP = None
+
+
+def _iniciar_worker_NFP(lista_pecas, motor=None):
+    global _PECAS_NFP, _MOTOR_NFP
+    _PECAS_NFP = lista_pecas
+    _MOTOR_NFP = motor
+
+
+def calcular_entrada_NFP(chave, pecas=None, motor=None):
+    tipoA, grauA, tipoB, grauB = chave
+    pecas = _PECAS_NFP if pecas is None else pecas
+    motor = _MOTOR_NFP if motor is None else motor
+    return entrada_NFP(pecas[tipoA], grauA, pecas[tipoB], grauB, motor=motor)
+
+
+def pre_processar_NFP(rotacoes, lista_pecas, offset, env, processos=None, checkpoint=None, simetria=False, motor=None, cache=None):
+    lista_unica = RegistroPecas(lista_pecas).pecas
+    simetria = simetria and rotacoes_simetricas(rotacoes)
+
+    if simetria:
+        chaves = chaves_canonicas(len(lista_unica), rotacoes)
+    else:
+        chaves = [(tipoA, grauA, tipoB, grauB)
+                  for tipoA in range(len(lista_unica)) for grauA in rotacoes
+                  for tipoB in range(len(lista_unica)) for grauB in rotacoes]
+    reaproveitadas = cache.buscar(chaves) if cache is not None else {}
+    novas = [chave for chave in chaves if chave not in reaproveitadas]
+
+    if processos is not None:
+        assinatura = ('MRCAP_MCA', [tuple(map(tuple, peca)) for peca in lista_unica], list(rotacoes), offset, motor)
+        tabela_nfps = calcular_tabela_paralela(
+            novas, calcular_entrada_NFP, processos or None, checkpoint, assinatura,
+            _iniciar_worker_NFP, (lista_unica, motor), len(lista_unica) * len(rotacoes)
+        )
+    else:
+        tabela_nfps = {}
+        total = len(novas)
+        for atual, chave in enumerate(novas, 1):
+            porcentagem = (atual / total) * 100
+            print(f"\rPré-processando NFPs: {porcentagem:.1f}% concluído", end="")
+            tipoA, grauA, tipoB, grauB = chave
+            tabela_nfps[chave] = entrada_NFP(lista_unica[tipoA], grauA, lista_unica[tipoB], grauB, env, motor)
+    tabela_nfps = {chave: reaproveitadas[chave] if chave in reaproveitadas else tabela_nfps[chave] for chave in chaves}
+
+    if simetria:
+        return TabelaNFPSimetrica(tabela_nfps, lista_unica, rotacoes)
     return tabela_nfps
 import matplotlib.pyplot as plt
 from matplotlib.patches import PathPatch
@@ -382,9 +440,9 @@ def plot_shapely_geometry(ax, geom, facecolor='lightblue', edgecolor='black', al
         ax.add_patch(patch)
 
 
-def NFP(PecaA, grauA, PecaB, grauB, env):
-    pontos_pol_A = env.rot_pol(env.lista.index(PecaA), grauA)
-    pontos_pol_B = env.rot_pol(env.lista.index(PecaB), grauB)
+def NFP(PecaA, grauA, PecaB, grauB, env=None):
+    pontos_pol_A = rotacionar_peca(PecaA, grauA)
+    pontos_pol_B = rotacionar_peca(PecaB, grauB)
 
     if Polygon(pontos_pol_B).equals(Polygon(pontos_pol_B).convex_hull):
         convex_partsB = [pontos_pol_B]
@@ -395,13 +453,12 @@ def NFP(PecaA, grauA, PecaB, grauB, env):
         convex_partsA = [pontos_pol_A]
     else:
         convex_partsA = triangulate_shapely(pontos_pol_A)
+    nfps_partes = no_fit_polygon_lote(convex_partsA, convex_partsB)
     nfps_convx = []
     intersec_parts = []
-    for cb_poly in convex_partsB:
+    for b in range(len(convex_partsB)):
         intersec_B = []
-        for ca_poly in convex_partsA:
-            nfp_part = NoFitPolygon(ca_poly, cb_poly)
-
+        for nfp_part in nfps_partes[b * len(convex_partsA):(b + 1) * len(convex_partsA)]:
             if nfp_part and not nfp_part.is_empty:
                 nfps_convx.append(nfp_part)
                 intersec_B.append(nfp_part)
@@ -461,7 +518,7 @@ def NFP(PecaA, grauA, PecaB, grauB, env):
         intersecao_esquerda = nfp_unido.boundary.intersection(linha_esquerda)
         pontos_candidatos.update(extrair_vertices(intersecao_esquerda))
     for ponto in pontos_pol_nor_A:
-        pontos_candidatos.add(Point(ponto))
+        pontos_candidatos.add(ponto)
     intersec = MultiPoint(list(pontos_candidatos))
     nfp_f = []
     inter = set()
@@ -578,7 +635,7 @@ def calcular_dimensoes(lista):
 class MRCAP_MCA():
 
 
-    def __init__(self,dataset='fu',Base=None,Altura=None,Escala=None, Graus = None, tabela = None, margem = 0, tempo=200, pairwise_IN = False):
+    def __init__(self,dataset='fu',Base=None,Altura=None,Escala=None, Graus = None, tabela = None, margem = 0, tempo=200, pairwise_IN = False, processos_nfp = None, simetria_nfp = False, nfp_sob_demanda = False, persistir_nfp = False, motor_nfp = None, nfp_base = None, memoria_layouts = 256, resolucao_raster = None, tempo_raster = None, memoria_caches = 256, verificar_hash = False, verificar_objetivo = False, threads_onepass = 1, onepass = False, processos_decoder = None, cache_custos = None):
         self.save_q_learning_report = True
         self.counter = 0
         self.BRKGA_parameters = {
@@ -621,6 +678,7 @@ class MRCAP_MCA():
         }
         self.max_time = tempo
         self.start_time = time.time()
+        self.resolucao_raster = resolucao_raster
         self.dataset = dataset
         self.instance_name = dataset
         lista = ler_poligonos(self.dataset)
@@ -646,6 +704,8 @@ class MRCAP_MCA():
             )
         self.lista_original = lista
         self.lista = copy.deepcopy(self.lista_original)
+        self.registro = RegistroPecas(self.lista_original)
+        self.alinhar_tipos()
         porcentagens_por_dataset = {
             'albano': 0.0,
             'dagli': 0.0,
@@ -669,8 +729,13 @@ class MRCAP_MCA():
         self.cordenadas_area_orig = ( [0,0] , [self.base,0] , [self.base,self.altura] , [0,self.altura] )
         self.pecas_posicionadas = []
         self.indices_pecas_posicionadas = []
-        self.dict_nfps = {}
-        self.dict_sol = {}
+        self.dict_nfps = CacheLimitado(memoria_caches * 2**20)
+        self.regioes_ocupadas = {}
+        self.mapas_raster = {}
+        self.hashes_layout = [0]
+        self.acumulados = [(0, math.inf, -math.inf, math.inf, -math.inf)]
+        self.contagem_tipos = {}
+        self.dict_sol = CacheLimitado(memoria_caches * 2**20)
         self.LS_type = 'Best'
         self.greedy = []
         self.dict_best = {
@@ -706,50 +771,47 @@ class MRCAP_MCA():
                     "ED-15": -800.00,
                     "ED-16": -800.00,
                 }
-        self.dict_feasible = {}
-        self.lista_anterior = []
+        self.dict_feasible = CacheLimitado(memoria_caches * 2**20)
+        self.dict_regras = CacheLimitado(memoria_caches * 2**20)
         self.best_fit = 100000
+        self.margem = margem
+        self.processos_nfp = processos_nfp
+        self.simetria_nfp = simetria_nfp
+        self.nfp_sob_demanda = nfp_sob_demanda
+        self.persistir_nfp = persistir_nfp
+        self.nfp_base = nfp_base
+        self.layouts = TrieLayouts(memoria_layouts * 2**20)
+        self.tempo_raster = self.max_time / 3 if tempo_raster is None else tempo_raster
+        self.inicio_raster = None
+        self.modo_raster = False
+        self.exato = False
+        self.memorias = {}
+        self.verificar_hash = verificar_hash
+        self.verificar_objetivo = verificar_objetivo
+        self.threads_onepass = threads_onepass
+        self.onepass = onepass
+        self.processos_decoder = processos_decoder
+        self.avaliador_lote = None
+        self.chaves_hash = {}
+        self.motor_nfp = motor_nfp or 'decomposicao'
 
         if tabela is not None:
-            self.tabela_nfps = tabela
+            self.definir_tabela_nfps(tabela_por_tipos(tabela, self.registro))
         else:
             pairwise_mode = pairwise_IN and (porcentagem > 0)
 
             if pairwise_mode:
                 nfp_file = os.path.join(_NFP_DIR, f"nfp_{self.dataset}.txt")
-
-                if os.path.exists(nfp_file):
-                    with open(nfp_file, "r") as f:
-                        conteudo = f.read()
-                    self.tabela_nfps = ast.literal_eval(conteudo)
-                else:
-                    self.tabela_nfps = pre_processar_NFP(self.graus, self.lista, margem, self)
-                    with open(nfp_file, "w") as f:
-                        f.write(repr(self.tabela_nfps))
+                self.definir_tabela_nfps(self.carregar_nfps(nfp_file))
                 pares_selecionados = self.pairwise(porcentagem_cluster=porcentagem)
                 self.lista = self.criar_lista_clusterizada(pares_selecionados)
                 self.lista_original = copy.deepcopy(self.lista)
-                nfp_file = f"nfp_{self.dataset}_novo_pairwise_2.txt"
-
-                if os.path.exists(nfp_file):
-                    with open(nfp_file, "r") as f:
-                        conteudo = f.read()
-                    self.tabela_nfps = ast.literal_eval(conteudo)
-                else:
-                    self.tabela_nfps = pre_processar_NFP(self.graus, self.lista, margem, self)
-                    with open(nfp_file, "w") as f:
-                        f.write(repr(self.tabela_nfps))
+                self.registro = RegistroPecas(self.lista_original)
+                self.alinhar_tipos()
+                self.definir_tabela_nfps(self.carregar_nfps())
             else:
                 nfp_file = os.path.join(_NFP_DIR, f"nfp_{self.dataset}.txt")
-
-                if os.path.exists(nfp_file):
-                    with open(nfp_file, "r") as f:
-                        conteudo = f.read()
-                    self.tabela_nfps = ast.literal_eval(conteudo)
-                else:
-                    self.tabela_nfps = pre_processar_NFP(self.graus, self.lista, margem, self)
-                    with open(nfp_file, "w") as f:
-                        f.write(repr(self.tabela_nfps))
+                self.definir_tabela_nfps(self.carregar_nfps(nfp_file))
         self.lista.sort(
                 key=lambda coords: Polygon(coords).area,
                 reverse=True
@@ -758,6 +820,7 @@ class MRCAP_MCA():
                 key=lambda coords: Polygon(coords).area,
                 reverse=True
             )
+        self.alinhar_tipos()
         self.max_pecas = len(self.lista_original)
         self.tam_solution = 2 * self.max_pecas
         self.regras = {
@@ -774,6 +837,16 @@ class MRCAP_MCA():
             10: self.NCNFP
         }
 
+        if self.onepass:
+            self.regras[len(self.regras)] = self.OnePass
+        self.custos_disco = None
+
+        if cache_custos:
+            simetria = isinstance(self.tabela_nfps, TabelaNFPSimetrica)
+            contexto = impressao_digital(type(self).__name__, VERSAO_NFP, self.motor_nfp, self.margem, self.base, self.altura, self.graus, len(self.regras), self.lista_original,
+                                         simetria, self.onepass, self.nfp_base)
+            self.custos_disco = CacheCustos(contexto, None if cache_custos is True else cache_custos)
+
 
     def plot_pairwise_geometries(self, peca1_poly, peca2_poly, nfp_poly, titulo="", filepath="."):
         fig, ax = plt.subplots(figsize=(10, 8))
@@ -875,7 +948,7 @@ class MRCAP_MCA():
                         print(f"Progresso (cálculo novo): {step}/{total_steps}", end='\r')
                         self.reset()
                         self.acao(i, 0, 0, grau1_idx)
-                        nfp_result, intersec_result = self.nfp(self.lista.index(self.lista_original[j]), grau2_idx)
+                        nfp_result, intersec_result = self.nfp(self.ids_restantes.index(j), grau2_idx)
                         self.remover_ultima_acao()
 
                         if not nfp_result or nfp_result.is_empty:
@@ -899,7 +972,7 @@ class MRCAP_MCA():
                             poly1 = Polygon(self.rot_pol(i, grau1_idx))
                             poly2_coords = self.rot_pol(j, grau2_idx)
                             poly2 = Polygon([(p[0] + ponto_encaixe[0], p[1] + ponto_encaixe[1]) for p in poly2_coords])
-                            ch_poly1 = poly1.convex_hull
+                            ch_poly1 = self.geometria.cascos[self.tipos_original[i], grau1_idx]
                             ch_poly2 = poly2.convex_hull
                             ch_uniao = unary_union([poly1, poly2]).convex_hull
                             ratio1_alt = ch_poly1.intersection(poly2).area / ch_poly1.area if ch_poly1.area > 1e-9 else 0
@@ -948,7 +1021,7 @@ class MRCAP_MCA():
             poly2_coords = self.rot_pol(aval['j'], aval['grau2'])
             poly2 = Polygon([(p[0] + ponto[0], p[1] + ponto[1]) for p in poly2_coords])
             self.acao(aval['i'], 0, 0, aval['grau1'])
-            nfp_plot, _ = self.nfp(self.lista.index(self.lista_original[aval['j']]), aval['grau2'])
+            nfp_plot, _ = self.nfp(self.ids_restantes.index(aval['j']), aval['grau2'])
             self.remover_ultima_acao()
             titulo = (f"Rank #{rank + 1} | CV {aval['value']:.3f}\n"
                     f"P ({aval['i']},{aval['j']}) G ({aval['grau1']},{aval['grau2']})\n"
@@ -1010,140 +1083,190 @@ class MRCAP_MCA():
         peca_posicionar = self.rot_pol(peca, grau_idx)
         pontos_posicionar = [(x + cor[0], y + cor[1]) for cor in peca_posicionar]
         self.pecas_posicionadas.append(pontos_posicionar)
-        self.indices_pecas_posicionadas.append([x,y,grau_idx,self.lista_original.index(self.lista[peca])])
-        self.lista_anterior.append(copy.deepcopy(self.lista))
+        self.indices_pecas_posicionadas.append([x,y,grau_idx,self.ids_restantes.pop(peca)])
+        self.hashes_layout.append(self.hashes_layout[-1] ^ zobrist(len(self.hashes_layout), self.lista_tipos[peca], grau_idx, x, y))
+        tipo = self.lista_tipos[peca]
+        minx, miny, maxx, maxy = self.geometria.limites[tipo, grau_idx]
+        area, menor_x, maior_x, menor_y, maior_y = self.acumulados[-1]
+        self.acumulados.append((area + self.geometria.areas_inteiras[tipo], min(menor_x, x + minx), max(maior_x, x + maxx),
+                                min(menor_y, y + miny), max(maior_y, y + maxy)))
+        self.contagem_tipos[tipo] = self.contagem_tipos.get(tipo, 0) + 1
         self.lista.pop(peca)
+        self.lista_tipos.pop(peca)
+
+
+    def carregar_nfps(self, nfp_file=None):
+        extras = [nfp_file] if nfp_file is not None and self.motor_nfp == 'decomposicao' else []
+
+        if self.nfp_base is not None:
+            tipos_novos, pecas_removidas = diferenca_pecas(self.nfp_base, self.registro)
+            print(f"Tabela base {self.nfp_base}: {len(tipos_novos)} tipos novos, {len(pecas_removidas)} removidos")
+            extras.insert(0, self.nfp_base)
+        cache = CacheNFP(self.registro, self.graus, self.margem, self.motor_nfp, VERSAO_NFP, extras=extras, simetria=self.simetria_nfp)
+
+        if self.nfp_sob_demanda:
+            arquivo = cache.arquivo if self.persistir_nfp else None
+            return ProvedorNFP(partial(calcular_entrada_NFP, motor=self.motor_nfp), self.registro, cache, arquivo=arquivo)
+        tabela = cache.carregar()
+
+        if tabela is None:
+            tabela = pre_processar_NFP(self.graus, self.lista, self.margem, self, self.processos_nfp, caminho_checkpoint(cache.arquivo), self.simetria_nfp, self.motor_nfp, cache)
+            cache.salvar(tabela)
+        return tabela
+
+
+    def definir_tabela_nfps(self, tabela):
+        self.tabela_nfps = tabela
+        self.geometrias_nfp = GeometriasNFP(tabela, capacidade=tabela.capacidade if isinstance(tabela, ProvedorNFP) else None)
+        self.layouts.limpar()
+
+        if not self.nfp_sob_demanda:
+            self.geometrias_nfp.materializar()
+
+
+    def alinhar_tipos(self):
+        self.tipos_original = [self.registro.tipo(peca) for peca in self.lista_original]
+        self.lista_tipos = list(self.tipos_original)
+        self.ids_restantes = list(range(len(self.lista_original)))
+        self.geometria = GeometriaPecas(self.registro.pecas)
+        self.areas_pendentes = list(itertools.accumulate(reversed([self.geometria.areas_inteiras[tipo] for tipo in self.tipos_original]), initial=0))[::-1]
+        self.motor_raster = None
+
+        if self.resolucao_raster:
+            self.motor_raster = MotorRaster(self.geometria, self.altura / self.resolucao_raster, folga_pecas=25)
 
 
     def reset(self):
-        self.lista = copy.deepcopy(self.lista_original)
+        self.lista = list(self.lista_original)
+        self.lista_tipos = list(self.tipos_original)
+        self.ids_restantes = list(range(len(self.lista_original)))
         self.pecas_posicionadas = []
         self.indices_pecas_posicionadas = []
+        self.regioes_ocupadas = {}
+        self.mapas_raster = {}
+        self.hashes_layout = [0]
+        self.acumulados = [(0, math.inf, -math.inf, math.inf, -math.inf)]
+        self.contagem_tipos = {}
 
 
     def remover_ultima_acao(self):
 
         if self.pecas_posicionadas:
-            self.lista = copy.deepcopy(self.lista_anterior[-1])
-            self.lista_anterior.pop()
+            id_peca = self.indices_pecas_posicionadas.pop()[3]
+            tipo = self.tipos_original[id_peca]
+            posicao = bisect_left(self.ids_restantes, id_peca)
+            self.ids_restantes.insert(posicao, id_peca)
+            self.lista.insert(posicao, self.lista_original[id_peca])
+            self.lista_tipos.insert(posicao, self.tipos_original[id_peca])
             self.pecas_posicionadas.pop()
-            self.indices_pecas_posicionadas.pop()
+            self.hashes_layout.pop()
+            self.acumulados.pop()
+            self.contagem_tipos[tipo] -= 1
+
+            if not self.contagem_tipos[tipo]:
+                del self.contagem_tipos[tipo]
+            profundidade = len(self.indices_pecas_posicionadas)
+            for pilha in [*self.regioes_ocupadas.values(), *self.mapas_raster.values()]:
+                while pilha and pilha[-1][0] > profundidade:
+                    pilha.pop()
+
+
+    def estado_layout(self):
+        return (list(self.lista), list(self.lista_tipos), list(self.ids_restantes), list(self.pecas_posicionadas),
+                list(self.indices_pecas_posicionadas), list(self.hashes_layout), list(self.acumulados), dict(self.contagem_tipos),
+                {chave: list(pilha) for chave, pilha in self.regioes_ocupadas.items()})
+
+
+    def restaurar_layout(self, estado):
+        lista, lista_tipos, ids_restantes, pecas_posicionadas, indices, hashes, acumulados, contagem_tipos, regioes = estado
+        self.lista = list(lista)
+        self.lista_tipos = list(lista_tipos)
+        self.ids_restantes = list(ids_restantes)
+        self.pecas_posicionadas = list(pecas_posicionadas)
+        self.indices_pecas_posicionadas = list(indices)
+        self.hashes_layout = list(hashes)
+        self.acumulados = list(acumulados)
+        self.contagem_tipos = dict(contagem_tipos)
+        self.regioes_ocupadas = {chave: list(pilha) for chave, pilha in regioes.items()}
+        self.mapas_raster = {}
 
 
     def rot_pol(self,pol, grau_indice):
-        pontos = self.lista[pol]
-        px, py = pontos[0]
-        resultado = []
-        for x, y in pontos:
-            dx, dy = x - px, y - py
-
-            if grau_indice == 0:
-                nx, ny = dx, dy
-            elif grau_indice == 1:
-                nx, ny = -dy, dx
-            elif grau_indice == 2:
-                nx, ny = -dx, -dy
-            elif grau_indice == 3:
-                nx, ny = dy, -dx
-            resultado.append([px + nx, py + ny])
-        min_x = min(p[0] for p in resultado)
-        min_y = min(p[1] for p in resultado)
-
-        if min_x < 0 or min_y < 0:
-            resultado = [(x - min_x if min_x < 0 else x,
-                        y - min_y if min_y < 0 else y) for x, y in resultado]
-        return resultado
+        return self.geometria.coordenadas[self.lista_tipos[pol], grau_indice]
 
 
     def ifp(self, peca_idx,grau_indice):
-        peca = self.rot_pol(peca_idx,grau_indice)
-        maxx = max([x for x,y in peca])
-        maxy = max([y for x,y in peca])
-        minx = min([x for x,y in peca])
-        miny = min([y for x,y in peca])
-
-        if (maxx - minx) > (self.base) or (maxy - miny) > (self.altura):
-            return []
-        cords = self.cordenadas_area
-        v0 = (0 - minx, 0 - miny)
-        v1 = (self.base - maxx, 0 - miny)
-        v2 = (self.base - maxx, self.altura - maxy)
-        v3 = (0 - minx, self.altura - maxy)
-        ifp = [v0,v1,v2,v3]
-        return ifp
+        return self.geometria.ifp(self.lista_tipos[peca_idx], grau_indice, self.base, self.altura)
 
 
     def nfp(self, peca, grau_indice):
-        nfps = []
-        todos_pontos_de_encontro = []
-        chaves = []
-        maior_nfp = (Polygon(), MultiPoint())
-        start_nfp = 0
-        i = 0
-        for x2, y2, grau1, pol_idx in self.indices_pecas_posicionadas:
-            chave = (
-                tuple(self.lista_original[pol_idx]), grau1,
-                tuple(self.lista[peca]), grau_indice
-            )
-            chaves.append((chave, x2, y2))
-            i+=1
-
-            if tuple(chaves) in self.dict_nfps:
-                maior_nfp = self.dict_nfps[tuple(chaves)]
+        tipo = self.lista_tipos[peca]
+        pilha = self.regioes_ocupadas.setdefault((tipo, grau_indice), [])
+        profundidade = len(self.indices_pecas_posicionadas)
+
+        if pilha and pilha[-1][0] == profundidade:
+            return pilha[-1][1]
+        start_nfp, maior_nfp = pilha[-1] if pilha else (0, (Polygon(), MultiPoint()))
+        for i in range(start_nfp + 1, profundidade + 1):
+            prefixo = (self.hashes_layout[i], tipo, grau_indice)
+
+            if prefixo in self.dict_nfps:
+                self.conferir_hash(prefixo, i)
+                maior_nfp = self.dict_nfps[prefixo]
                 start_nfp = i
-        prefixo_t = tuple(chaves)
+        prefixo_t = (self.hashes_layout[profundidade], tipo, grau_indice)
 
-        if prefixo_t in self.dict_nfps:
-            return self.dict_nfps[prefixo_t]
-        for (chave, x2, y2) in chaves[start_nfp:]:
-            nfp_salvo = self.tabela_nfps.get(chave)
-
-            if not nfp_salvo:
-                continue
-            coords_base_nfp = nfp_salvo[0]
-            pontos_intersec_base = nfp_salvo[1]
-            base_nfp = Polygon(coords_base_nfp)
-
-            if base_nfp.is_empty:
+        if start_nfp == profundidade:
+            pilha.append((profundidade, maior_nfp))
+            return maior_nfp
+        chaves = []
+        for x2, y2, grau1, pol_idx in self.indices_pecas_posicionadas[start_nfp:]:
+            chaves.append(((self.tipos_original[pol_idx], grau1, tipo, grau_indice), x2, y2))
+        ids = []
+        deslocamentos = []
+        for (chave, x2, y2) in chaves:
+            id_nfp = self.geometrias_nfp.id(chave)
+
+            if id_nfp is None:
                 continue
-            p = affinity.translate(base_nfp, xoff=x2, yoff=y2)
-            nfps.append(p)
+            ids.append(id_nfp)
+            deslocamentos.append((x2, y2))
 
-            if pontos_intersec_base:
-                pontos_transladados = [(pt[0] + x2, pt[1] + y2) for pt in pontos_intersec_base]
-                todos_pontos_de_encontro.append((pontos_transladados, p))
+        if not ids:
 
-        if not nfps:
-            return None, None
+            if start_nfp == 0:
+                return None, None
+            pilha.append((profundidade, maior_nfp))
+            return maior_nfp
+        nfps, encolhidos, pontos_transladados = self.geometrias_nfp.transladar(ids, deslocamentos)
+        poligonos = list(nfps) + [maior_nfp[0]]
+        todos_pontos_de_encontro = [(pontos, origem) for origem, pontos in enumerate(pontos_transladados) if len(pontos)]
 
         if maior_nfp[1] is not None and maior_nfp[0] is not None:
-            todos_pontos_de_encontro.append((list(maior_nfp[1].geoms), maior_nfp[0]))
-        ocupado = unary_union([maior_nfp[0]] + [nfp.buffer(-0.000001) for nfp in nfps])
+            todos_pontos_de_encontro.append((shapely.get_coordinates(maior_nfp[1]), len(nfps)))
+        ocupado = unary_union([maior_nfp[0]] + list(encolhidos))
         pontos_validos = []
 
         if todos_pontos_de_encontro:
-            for pontos, nfp_origem in todos_pontos_de_encontro :
-                for ponto in pontos:
-                    valido = True
-                    pt = Point(ponto)
-                    for nfp in nfps + [maior_nfp[0]]:
-
-                        if nfp == nfp_origem:
-                            continue
-
-                        if nfp.contains(pt):
-                            valido = False
-                            break
-
-                    if valido:
-                        pontos_validos.append(ponto)
+            coordenadas = np.concatenate([pontos for pontos, _ in todos_pontos_de_encontro])
+            origens = np.concatenate([np.full(len(pontos), origem) for pontos, origem in todos_pontos_de_encontro])
+            pontos_idx, poligonos_idx = STRtree(poligonos).query(shapely.points(coordenadas), predicate='within')
+            validos = np.ones(len(coordenadas), dtype=bool)
+            validos[pontos_idx[poligonos_idx != origens[pontos_idx]]] = False
+            pontos_validos = list(map(tuple, coordenadas[validos].tolist()))
         intersec_final = MultiPoint(pontos_validos ) if pontos_validos else None
+        self.conferir_hash(prefixo_t, profundidade)
         self.dict_nfps[prefixo_t] = (ocupado, intersec_final)
+        pilha.append((profundidade, (ocupado, intersec_final)))
         return ocupado, intersec_final
 
 
     def feasible(self, peca, grau_indice, area=False):
-        chave = tuple([peca, grau_indice, tuple(map(tuple, self.pecas_posicionadas)), self.base, self.altura])
+
+        if self.modo_raster:
+            return self.feasible_raster(peca, grau_indice, area)
+        chave = (self.hashes_layout[-1], self.lista_tipos[peca], grau_indice, self.base, self.altura)
+        self.conferir_hash(chave, len(self.indices_pecas_posicionadas))
 
         if chave in self.dict_feasible:
             cached_result = self.dict_feasible[chave]
@@ -1206,14 +1329,140 @@ class MRCAP_MCA():
             return vertices_validos
 
 
-    def BL(self, peca, grau_indice):
-        positions = self.feasible(peca,grau_indice)
+    def feasible_raster(self, peca, grau_indice, area=False):
+        tipo = self.lista_tipos[peca]
+        pilha = self.mapas_raster.setdefault((tipo, grau_indice, self.base, self.altura), [])
+        profundidade = len(self.indices_pecas_posicionadas)
+
+        if not pilha or pilha[-1][0] != profundidade:
+            colocadas = [(self.tipos_original[idx], grau, x, y) for x, y, grau, idx in self.indices_pecas_posicionadas]
+            proibidas = self.motor_raster.proibidas(tipo, grau_indice, self.base, self.altura, colocadas, pilha[-1][:2] if pilha else None)
+            pilha.append((profundidade, proibidas) + self.motor_raster.posicoes(tipo, grau_indice, proibidas))
+        _, _, posicoes, area_livre = pilha[-1]
+
+        if area:
+            return posicoes, area_livre
+        return posicoes
+
+
+    def fase_raster(self):
+
+        if self.motor_raster is None or self.exato:
+            return False
+
+        if self.inicio_raster is None:
+            self.inicio_raster = time.time()
+        return time.time() - self.inicio_raster < self.tempo_raster
+
+
+    def usar_raster(self, ativo):
+
+        if ativo != self.modo_raster:
+            self.memorias[self.modo_raster] = (self.dict_sol, self.layouts)
+            self.dict_sol, self.layouts = self.memorias.pop(ativo, (CacheLimitado(self.dict_sol.capacidade), TrieLayouts(self.layouts.capacidade)))
+            self.modo_raster = ativo
+
+
+    def conferir_hash(self, chave, profundidade):
+
+        if not self.verificar_hash:
+            return
+        layout = tuple((self.tipos_original[idx], grau, x, y) for x, y, grau, idx in self.indices_pecas_posicionadas[:profundidade])
+
+        if self.chaves_hash.setdefault(chave, layout) != layout:
+            raise RuntimeError(f"Colisão no hash do layout {chave[0]:#018x} com {profundidade} peças")
+
+
+    def conferir_objetivo(self):
+
+        if not self.verificar_objetivo:
+            return
+        tipos_usados = sorted(self.tipos_original[idx] for *_, idx in self.indices_pecas_posicionadas)
+        area_total = sum(self.geometria.areas[tipo] for tipo in tipos_usados)
+        coords = [ponto for pol in self.pecas_posicionadas for ponto in pol]
+        esperado = (min((x for x, _ in coords), default=math.inf), max((x for x, _ in coords), default=-math.inf),
+                    min((y for _, y in coords), default=math.inf), max((y for _, y in coords), default=-math.inf))
+        _, *limites = self.acumulados[-1]
+        contagem = {}
+        for tipo in tipos_usados:
+            contagem[tipo] = contagem.get(tipo, 0) + 1
+
+        if (not math.isclose(self.area_posicionada(), area_total, rel_tol=1e-9) or tuple(limites) != esperado
+                or contagem != self.contagem_tipos):
+            raise RuntimeError(f"Acumuladores do objetivo divergem do layout com {len(self.pecas_posicionadas)} peças")
+
+
+    def area_posicionada(self):
+        return self.acumulados[-1][0] / self.geometria.denominador_areas
+
+
+    def limite_custo(self, proxima):
+        return -1 * self.area_usada()
+
+
+    def estatisticas_caches(self):
+        estatisticas = {
+            'dict_sol': self.dict_sol.estatisticas(),
+            'dict_feasible': self.dict_feasible.estatisticas(),
+            'dict_regras': self.dict_regras.estatisticas(),
+            'dict_nfps': self.dict_nfps.estatisticas(),
+            'layouts': self.layouts.estatisticas(),
+        }
+
+        if isinstance(self.tabela_nfps, ProvedorNFP):
+            estatisticas['nfps'] = self.tabela_nfps.estatisticas()
+
+        if self.custos_disco is not None:
+            estatisticas['custos_disco'] = self.custos_disco.estatisticas()
+        return estatisticas
+
+
+    def chave_custo(self, sol):
+
+        if self.custos_disco is None or self.modo_raster:
+            return None
+        return chave_solucao(sol)
+
+
+    def guardar_custo(self, chave, valor):
+
+        if chave is not None:
+            self.custos_disco.guardar(chave, valor)
+
+
+    def cost_exato(self, sol):
+        self.exato = True
+        fit = self.cost(sol, save=False)
+        self.exato = False
+        return fit
+
+
+    def centro_layout(self):
+
+        if not self.pecas_posicionadas:
+            return None
+        centros = []
+        for peca in self.pecas_posicionadas:
+            soma_x_peca = sum([x for x,y in peca])
+            soma_y_peca = sum([y for x,y in peca])
+            centros.append((soma_x_peca/len(peca) , soma_y_peca/len(peca)))
+        soma_x = sum([x for x,y in centros])
+        soma_y = sum([y for x,y in centros])
+        num_vertices = len(self.pecas_posicionadas)
+        return (soma_x / num_vertices, soma_y / num_vertices)
 
-        if not positions:
-            return []
-        positions_bl = sorted(positions, key=lambda ponto: (ponto[0], ponto[1]))
-        bl = positions_bl[0]
-        return bl
+
+    def regras_posicionamento(self, peca, grau_indice):
+        chave = (self.modo_raster, self.hashes_layout[-1], self.lista_tipos[peca], grau_indice, self.base, self.altura)
+
+        if chave not in self.dict_regras:
+            positions = self.feasible(peca, grau_indice)
+            self.dict_regras[chave] = avaliar_regras(positions, (self.base / 2, self.altura / 2), self.centro_layout())
+        return self.dict_regras[chave]
+
+
+    def BL(self, peca, grau_indice):
+        return self.regras_posicionamento(peca, grau_indice)['BL']
 
 
     def BL_NFP(self, peca, grau_indice):
@@ -1318,59 +1567,15 @@ class MRCAP_MCA():
 
 
     def NC(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        centro_bin = (self.base / 2, self.altura / 2)
-        sorted_positions = sorted(positions,
-                                key=lambda ponto: math.dist(ponto, centro_bin))
-        return sorted_positions[0]
+        return self.regras_posicionamento(peca, grau_indice)['NC']
 
 
     def NCNFP(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        sum_x = 0
-        sum_y = 0
-        len_vertices = len(positions)
-        for pos in positions:
-            sum_x+=pos[0]
-            sum_y+=pos[1]
-        centro_nfp = (sum_x/len_vertices , sum_y/len_vertices)
-        sorted_positions = sorted(positions,
-                                key=lambda ponto: math.dist(ponto, centro_nfp))
-        return sorted_positions[0]
+        return self.regras_posicionamento(peca, grau_indice)['NCNFP']
 
 
     def NCG(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-
-        if not self.pecas_posicionadas:
-            centro_bin = (self.base / 2, self.altura / 2)
-            sorted_positions = sorted(positions,
-                                    key=lambda ponto: math.dist(ponto, centro_bin))
-            return sorted_positions[0]
-        num_vertices = 0
-        soma_x = 0
-        soma_y = 0
-        centros = []
-        for peca in self.pecas_posicionadas:
-            soma_x_peca = sum([x for x,y in peca])
-            soma_y_peca = sum([y for x,y in peca])
-            centros.append((soma_x_peca/len(peca) , soma_y_peca/len(peca)))
-        soma_x = sum([x for x,y in centros])
-        soma_y = sum([y for x,y in centros])
-        num_vertices = len(self.pecas_posicionadas)
-        centro_layout = (soma_x / num_vertices, soma_y / num_vertices)
-        sorted_positions = sorted(positions,
-                                key=lambda ponto: math.dist(ponto, centro_layout))
-        return sorted_positions[0]
+        return self.regras_posicionamento(peca, grau_indice)['NCG']
 
 
     def NBL(self, peca, grau_indice):
@@ -1394,87 +1599,45 @@ class MRCAP_MCA():
 
 
     def LB(self, peca, grau_indice):
-        positions = self.feasible(peca,grau_indice)
-
-        if not positions:
-            return []
-        positions_lb = sorted(positions, key=lambda ponto: (ponto[1], ponto[0]))
-        lb = positions_lb[0]
-        return lb
+        return self.regras_posicionamento(peca, grau_indice)['LB']
 
 
     def BR(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        positions_br = sorted(positions, key=lambda ponto: (-ponto[0], ponto[1]))
-        br = positions_br[0]
-        return br
+        return self.regras_posicionamento(peca, grau_indice)['BR']
 
 
     def RB(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        positions_rb = sorted(positions, key=lambda ponto: (ponto[1], -ponto[0]))
-        rb = positions_rb[0]
-        return rb
+        return self.regras_posicionamento(peca, grau_indice)['RB']
 
 
     def UL(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        positions_ul = sorted(positions, key=lambda ponto: (ponto[0], -ponto[1]))
-        ul = positions_ul[0]
-        return ul
+        return self.regras_posicionamento(peca, grau_indice)['UL']
 
 
     def LU(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        positions_lu = sorted(positions, key=lambda ponto: (-ponto[1], ponto[0]))
-        lu = positions_lu[0]
-        return lu
+        return self.regras_posicionamento(peca, grau_indice)['LU']
 
 
     def UR(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        positions_ur = sorted(positions, key=lambda ponto: (-ponto[0], -ponto[1]))
-        ur = positions_ur[0]
-        return ur
+        return self.regras_posicionamento(peca, grau_indice)['UR']
 
 
     def RU(self, peca, grau_indice):
-        positions = self.feasible(peca, grau_indice)
-
-        if not positions:
-            return []
-        positions_ru = sorted(positions, key=lambda ponto: (-ponto[1], -ponto[0]))
-        ru = positions_ru[0]
-        return ru
+        return self.regras_posicionamento(peca, grau_indice)['RU']
 
 
     def avaliar_posicoes_onepass(self, pos, peca_idx, grau_indice):
         fits = []
-        seen_pecas = []
+        tipos_vistos = set()
         self.acao(peca_idx, pos[0], pos[1], grau_indice)
-        for peca in self.lista:
+        for idx, tipo in enumerate(self.lista_tipos):
 
-            if peca in seen_pecas:
+            if tipo in tipos_vistos:
                 continue
-            seen_pecas.append(peca)
+            tipos_vistos.add(tipo)
             for grau in self.graus:
-                _, area = self.feasible(self.lista.index(peca), grau, True)
-                fit = Polygon(peca).area/ area if area > 0 else 0
+                _, area = self.feasible(idx, grau, True)
+                fit = self.geometria.areas[tipo]/ area if area > 0 else 0
                 fits.append(fit)
 
         if fits == []:
@@ -1485,6 +1648,63 @@ class MRCAP_MCA():
         return fit
 
 
+    def regiao_livre(self, peca, grau_indice):
+        ifp_coords = self.ifp(peca, grau_indice)
+
+        if not ifp_coords:
+            return None
+        livre = Polygon(ifp_coords)
+
+        if self.pecas_posicionadas:
+            ocupado, _ = self.nfp(peca, grau_indice)
+
+            if ocupado and not ocupado.is_empty:
+                livre = livre.difference(ocupado)
+        return livre
+
+
+    def avaliar_candidatos_onepass(self, positions, peca, grau_indice):
+
+        if not positions:
+            return []
+        tipo = self.lista_tipos[peca]
+        restantes = self.lista_tipos[:peca] + self.lista_tipos[peca + 1:]
+        pares = []
+        for tipo_r in dict.fromkeys(restantes):
+            idx = self.lista_tipos.index(tipo_r)
+            for grau in self.graus:
+                pares.append((tipo_r, self.regiao_livre(idx, grau), self.geometrias_nfp.id((tipo, grau_indice, tipo_r, grau))))
+        validos = [par for par in pares if par[1] is not None]
+        com_nfp = [i for i, par in enumerate(validos) if par[2] is not None]
+        regioes = np.array([par[1] for par in validos] * len(positions), dtype=object)
+        removidos = np.array([Polygon()] * len(regioes), dtype=object)
+
+        if com_nfp:
+            ids = [validos[i][2] for i in com_nfp] * len(positions)
+            deslocamentos = [(pos[0], pos[1]) for pos in positions for _ in com_nfp]
+            _, encolhidos, _ = self.geometrias_nfp.transladar(ids, deslocamentos)
+            removidos[[c * len(validos) + i for c in range(len(positions)) for i in com_nfp]] = encolhidos
+        areas = areas_restantes(regioes, removidos, self.threads_onepass).reshape(len(positions), len(validos)).tolist()
+        resultado = []
+        for pos, areas_pos in zip(positions, areas):
+            fits = []
+            j = 0
+            for tipo_r, regiao, _ in pares:
+
+                if regiao is None:
+                    fits.append(0)
+                    continue
+                area = areas_pos[j]
+                j += 1
+                fits.append(self.geometria.areas[tipo_r] / area if area > 0 else 0)
+
+            if fits == []:
+                resultado.append(pos[0])
+            else:
+                resultado.append(pos[0] * (sum(fits) / len(fits)))
+        return resultado
+
+
     def OnePass(self, peca, grau_indice):
         positions = []
         for regra in range(len(self.regras) -  1):
@@ -1494,8 +1714,12 @@ class MRCAP_MCA():
                 positions.append(pos)
         best_pos = None
         best_fit = float('inf')
-        for pos in positions:
-            fit = self.avaliar_posicoes_onepass(pos, peca, grau_indice)
+
+        if self.modo_raster:
+            fits = [self.avaliar_posicoes_onepass(pos, peca, grau_indice) for pos in positions]
+        else:
+            fits = self.avaliar_candidatos_onepass(positions, peca, grau_indice)
+        for pos, fit in zip(positions, fits):
 
             if fit < best_fit:
                 best_fit = fit
@@ -1540,17 +1764,44 @@ class MRCAP_MCA():
         return rot_idx + regras_idx
 
 
-    def cost(self, sol, tag=0, save=True):
+    def buckets_chaves(self):
+        return [len(self.graus)] * self.max_pecas + [len(self.regras)] * self.max_pecas
+
+
+    def cost(self, sol, tag=0, save=True, cutoff=None):
+        self.usar_raster(self.fase_raster())
 
         if tuple(sol) in self.dict_sol:
             return self.dict_sol[tuple(sol)]
+        chave_disco = self.chave_custo(sol)
+        fit = self.custos_disco.buscar(chave_disco) if chave_disco is not None else None
+
+        if fit is not None:
+            self.dict_sol[tuple(sol)] = fit
+            return fit
         N = self.max_pecas
         rot = sol[:N]
         regras = sol[N:2*N]
-        for i, peca in enumerate(self.lista_original):
-            self.pack(self.lista.index(peca), rot[i], regras[i])
+        chaves = list(zip(rot, regras))
+        inicio, estado, no = self.layouts.buscar(chaves)
+
+        if estado is not None:
+            self.restaurar_layout(estado)
+        for i, peca in enumerate(self.lista_original[inicio:], inicio):
+            self.pack(self.ids_restantes.index(i), rot[i], regras[i])
+
+            if i + 1 < N:
+                no = self.layouts.guardar(no, chaves[i], self.estado_layout())
+
+            if cutoff is not None and i + 1 < N:
+                limite = self.limite_custo(i + 1)
+
+                if limite >= cutoff:
+                    self.reset()
+                    return limite
         fit = -1 * self.area_usada()
         self.dict_sol[tuple(sol)] = fit
+        self.guardar_custo(chave_disco, fit)
 
         if save:
             self.best_fit = fit # Update best fit anyway if saving? Or just plot.
@@ -1562,74 +1813,71 @@ class MRCAP_MCA():
         return fit
 
 
+    def cost_batch(self, keys_matrix):
+        sols = [self.decoder(keys) for keys in keys_matrix]
+
+        if not self.processos_decoder or self.processos_decoder <= 1 or len(sols) < 2:
+            return np.array([self.cost(sol) for sol in sols])
+
+        if self.avaliador_lote is None:
+            self.avaliador_lote = AvaliadorLote(self, self.processos_decoder)
+        fits = [fit for fit, _ in self.avaliador_lote.avaliar(sols)]
+        self.best_fit = min([self.best_fit] + fits)
+        return np.array(fits)
+
+
+    def encerrar_lote(self):
+
+        if self.avaliador_lote is not None:
+            self.avaliador_lote.fechar()
+            self.avaliador_lote = None
+
+        if self.custos_disco is not None:
+            self.custos_disco.descarregar()
+
+        if isinstance(self.tabela_nfps, ProvedorNFP):
+            self.tabela_nfps.salvar()
+
+
     def plot(self, legenda):
         output_path = os.path.join(_OUTPUT_DIR, f"{self.instance_name}_{time.time()}.png")
         draw_cutting_area(self.pecas_posicionadas, self.base, self.altura, legenda=legenda, filename=output_path)
 
 
     def get_used_width(self):
-        original_counter = Counter(tuple(map(tuple, pol)) for pol in self.lista_original)
-        nao_usado_counter = Counter(tuple(map(tuple, pol)) for pol in self.lista)
-        usados_counter = original_counter - nao_usado_counter
-        usados = []
-        for pol, count in usados_counter.items():
-            usados.extend([list(pol) for _ in range(count)])
-        area_total = sum(Polygon(pol).area for pol in usados)
-        coords = []
-        for pol in self.pecas_posicionadas:
-            for x,y in pol:
-                coords.append(x)
-
-        if coords == []:
+        self.conferir_objetivo()
+
+        if not self.pecas_posicionadas:
             return 0
-        larg = max(coords) - min(coords)
-        area_bin = (larg / self.escala) * (self.altura / self.escala)
-        return larg
+        _, menor_x, maior_x, _, _ = self.acumulados[-1]
+        return maior_x - menor_x
 
 
     def get_efficiency(self):
-        original_counter = Counter(tuple(map(tuple, pol)) for pol in self.lista_original)
-        nao_usado_counter = Counter(tuple(map(tuple, pol)) for pol in self.lista)
-        usados_counter = original_counter - nao_usado_counter
-        usados = []
-        for pol, count in usados_counter.items():
-            usados.extend([list(pol) for _ in range(count)])
-        area_total = sum(Polygon(pol).area for pol in usados)
-        coords = []
-        for pol in self.pecas_posicionadas:
-            for x,y in pol:
-                coords.append(x)
-
-        if coords == []:
+        larg = self.get_used_width()
+
+        if not self.pecas_posicionadas:
             return 0
-        larg = max(coords) - min(coords)
-        area_bin = (larg / self.escala) * (self.altura / self.escala)
+        area_total = self.area_posicionada()
         return area_total / (larg * self.altura / self.escala)
 
 
     def area_usada(self):
-        original_counter = Counter(tuple(map(tuple, pol)) for pol in self.lista_original)
-        nao_usado_counter = Counter(tuple(map(tuple, pol)) for pol in self.lista)
-        usados_counter = original_counter - nao_usado_counter
-        usados = []
-        for pol, count in usados_counter.items():
-            usados.extend([list(pol) for _ in range(count)])
-        area_total = sum(Polygon(pol).area for pol in usados)
-        coords = []
-        for pol in self.pecas_posicionadas:
-            for x,y in pol:
-                coords.append(x)
-        larg = max(coords) - min(coords)
-        faixa = self.base_inicial - larg
-        area_bin = (larg / self.escala) * (self.altura / self.escala)
-        area_continua, porcentagem_continua, largest_continuous_polygon = calcular_area_continua_nao_utilizada(self.pecas_posicionadas, self.cordenadas_area_orig, plot=False, buffer_distance=100)
+        faixa = self.base_inicial - self.get_used_width()
         return round(100* (faixa * self.altura)/self.area_orig, 2)
 
 
     def reset(self):
-        self.lista = copy.deepcopy(self.lista_original)
+        self.lista = list(self.lista_original)
+        self.lista_tipos = list(self.tipos_original)
+        self.ids_restantes = list(range(len(self.lista_original)))
         self.pecas_posicionadas = []
         self.indices_pecas_posicionadas = []
+        self.regioes_ocupadas = {}
+        self.mapas_raster = {}
+        self.hashes_layout = [0]
+        self.acumulados = [(0, math.inf, -math.inf, math.inf, -math.inf)]
+        self.contagem_tipos = {}
 
 if __name__ == '__main__':
     INSTANCES = ["ED-1", "ED-2", "ED-3", "ED-4", "ED-5", "ED-6", "ED-7",
@@ -1637,6 +1885,7 @@ if __name__ == '__main__':
     TIME_LIMIT = 60
     RESTART_RATIO = 1.0
     NUM_RUNS = 1
+    NFP_PROCESSES = None
     USE_PAIRWISE = False
     SAVE_DIR = os.path.join(_OUTPUT_DIR, "results_MCA")
     os.makedirs(SAVE_DIR, exist_ok=True)
@@ -1647,7 +1896,8 @@ if __name__ == '__main__':
         env = MRCAP_MCA(
             dataset=instance,
             tempo=TIME_LIMIT * RESTART_RATIO,
-            pairwise_IN=USE_PAIRWISE
+            pairwise_IN=USE_PAIRWISE,
+            processos_nfp=NFP_PROCESSES
         )
         save_file = os.path.join(SAVE_DIR, f"{instance}.csv")
         solver = RKO(env, print_best=True, save_directory=save_file)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+_ITOR_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(_ITOR_DIR, 'utils'))
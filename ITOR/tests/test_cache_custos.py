@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+from cache_custos import CacheCustos, chave_solucao, impressao_digital
+
+
+def test_contextos_e_chaves_separados(tmp_path):
+    arquivo = str(tmp_path / 'custos.sqlite')
+    a = CacheCustos(impressao_digital('fu', 0), arquivo)
+    b = CacheCustos(impressao_digital('fu', 1), arquivo)
+    chave = chave_solucao([0.1, 0.2])
+    a.guardar(chave, -10.5)
+    a.descarregar()
+
+    assert a.buscar(chave) == -10.5
+    assert a.buscar(chave_solucao([0.2, 0.1])) is None
+    assert b.buscar(chave) is None
+    assert chave_solucao([0.1, 0.2]) != chave_solucao([0.1, 0.2], 'extra')
+
+
+def test_acertos_e_falhas(tmp_path):
+    cache = CacheCustos('contexto', str(tmp_path / 'custos.sqlite'))
+    chave = chave_solucao([1, 2, 3])
+
+    assert cache.buscar(chave) is None
+    cache.guardar(chave, 3.0)
+    assert cache.buscar(chave) == 3.0
+    cache.descarregar()
+    assert cache.buscar(chave) == 3.0
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['acertos'], estatisticas['falhas'], estatisticas['pendentes']) == (2, 1, 0)
+    assert estatisticas['taxa_acerto'] == pytest.approx(2 / 3)
+
+
+def test_reabrir_arquivo(tmp_path):
+    arquivo = str(tmp_path / 'custos.sqlite')
+    cache = CacheCustos('contexto', arquivo, tamanho_lote=2)
+    chaves = [chave_solucao([i]) for i in range(3)]
+    for i, chave in enumerate(chaves):
+        cache.guardar(chave, float(i))
+    # o lote de 2 ja foi gravado; o terceiro custo so vai para o disco ao descarregar
+    assert len(cache.pendentes) == 1
+    assert CacheCustos('contexto', arquivo).buscar(chaves[2]) is None
+    cache.descarregar()
+    reaberto = CacheCustos('contexto', arquivo)
+
+    assert [reaberto.buscar(chave) for chave in chaves] == [0.0, 1.0, 2.0]
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+
+
+def test_contexto_separa_tabela_simetrica(tmp_path):
+    Knapsack2D = pytest.importorskip('Knapsack2D').Knapsack2D
+    arquivo = str(tmp_path / 'custos.sqlite')
+    with contextlib.redirect_stdout(io.StringIO()):
+        completa = Knapsack2D(dataset='fu', cache_custos=arquivo)
+        simetrica = Knapsack2D(dataset='fu', cache_custos=arquivo, simetria_nfp=True)
+        onepass = Knapsack2D(dataset='fu', cache_custos=arquivo, onepass=True)
+    contextos = {completa.custos_disco.contexto, simetrica.custos_disco.contexto, onepass.custos_disco.contexto}
+
+    assert len(contextos) == 3
+
+
+def test_spp_guarda_acerto_do_disco_em_memoria(tmp_path):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'SPP', 'code'))
+    SPP2D = pytest.importorskip('SPP2D').SPP2D
+    arquivo = str(tmp_path / 'custos.sqlite')
+    with contextlib.redirect_stdout(io.StringIO()):
+        primeiro = SPP2D(dataset='fu', cache_custos=arquivo)
+        segundo = SPP2D(dataset='fu', cache_custos=arquivo)
+    sol = primeiro.decoder([0.3] * primeiro.tam_solution)
+    fit = primeiro.cost(sol, save=False)
+    primeiro.custos_disco.descarregar()
+
+    assert segundo.cost(sol, save=False) == fit
+    assert segundo.cost(sol, save=False) == fit
+    assert (segundo.custos_disco.acertos, segundo.custos_disco.falhas) == (1, 0)
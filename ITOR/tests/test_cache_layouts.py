@@ -0,0 +1,30 @@
+import shapely
+from shapely import Point
+
+from cache_layouts import TrieLayouts, tamanho_estado
+
+
+def estado(profundidade, resolucao=64):
+    regiao = Point(profundidade, 0).buffer(1, resolucao)
+    peca = [(float(profundidade), 0.0), (profundidade + 1.0, 0.0), (profundidade + 1.0, 1.0)]
+    return ([0, 1, 2], [0, 0, 1], [0, 1, 2], [peca], [[profundidade, 0.0, 0, 0]], [0, profundidade],
+            [(0, 0.0, 1.0, 0.0, 1.0)], {0: 1}, {(0, 0): [(profundidade, (regiao, shapely.MultiPoint()))]})
+
+
+def test_estimativa_conta_geometrias():
+    pequeno, grande = estado(1, 4), estado(1, 256)
+    coordenadas = shapely.get_num_coordinates(grande[-1][(0, 0)][0][1][0])
+    assert tamanho_estado(grande) - tamanho_estado(pequeno) >= 16 * (coordenadas - 17)
+    assert tamanho_estado(grande) >= 16 * coordenadas
+
+
+def test_orcamento_respeitado():
+    capacidade = 40 * tamanho_estado(estado(0))
+    trie = TrieLayouts(capacidade)
+    for ramo in range(10):
+        no = trie.raiz
+        for profundidade in range(30):
+            no = trie.guardar(no, (ramo if profundidade == 0 else 0, profundidade), estado(profundidade))
+            assert trie.memoria <= capacidade
+            assert trie.memoria == sum(tamanho_estado(retido.estado) for retido in trie.lru)
+    assert 0 < len(trie) < 300
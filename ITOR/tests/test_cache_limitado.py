@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+
+from cache_limitado import CacheLimitado, tamanho_aproximado, tamanho_entrada
+
+
+def test_descarte_lru():
+    # cada entrada custa 1, entao a capacidade vira um limite de entradas
+    cache = CacheLimitado(3, tamanho=lambda chave, valor: 1)
+    for chave in 'abc':
+        cache[chave] = chave.upper()
+    assert cache['a'] == 'A'
+    cache['d'] = 'D'
+
+    assert list(cache) == ['c', 'a', 'd']
+    cache['c'] = 'C2'
+    cache['e'] = 'E'
+
+    assert list(cache) == ['d', 'c', 'e']
+    assert cache['c'] == 'C2'
+    assert cache.estatisticas()['descartes'] == 2
+
+
+def test_limite_de_bytes():
+    cache = CacheLimitado(100, tamanho=lambda chave, valor: valor)
+    cache['a'] = 40
+    cache['b'] = 50
+    assert cache.memoria == 90
+    cache['c'] = 30
+
+    assert list(cache) == ['b', 'c'] and cache.memoria == 80
+    cache['b'] = 10
+    assert list(cache) == ['c', 'b'] and cache.memoria == 40
+    # entrada maior que a capacidade nao entra nem descarta as outras
+    cache['grande'] = 101
+    assert 'grande' not in cache
+    assert list(cache) == ['c', 'b'] and cache.memoria == 40
+    del cache['c']
+    assert cache.memoria == 10
+    cache.clear()
+    assert len(cache) == 0 and cache.memoria == 0
+
+
+def test_memoria_nunca_passa_da_capacidade():
+    cache = CacheLimitado(2000)
+    rng = np.random.RandomState(0)
+    for _ in range(500):
+        chave = tuple(rng.randint(0, 50, size=rng.randint(1, 8)).tolist())
+        cache[chave] = float(rng.random_sample())
+
+        assert cache.memoria <= cache.capacidade
+        assert cache.memoria == sum(tamanho_entrada(k, cache.dados[k][0]) for k in cache)
+
+
+def test_acertos_e_falhas():
+    cache = CacheLimitado(10, tamanho=lambda chave, valor: 1)
+    cache['a'] = 1
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    assert cache.get('b', -1) == -1
+    with pytest.raises(KeyError):
+        cache['b']
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['entradas'], estatisticas['acertos'], estatisticas['falhas']) == (1, 1, 2)
+    assert estatisticas['taxa_acerto'] == pytest.approx(1 / 3)
+    assert CacheLimitado().estatisticas()['taxa_acerto'] == 0.0
+
+
+def test_tamanho_aproximado():
+    quadrado = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    array = np.zeros(1000)
+
+    assert tamanho_aproximado(quadrado) == 64 + 16 * 5
+    assert tamanho_aproximado(array) >= array.nbytes
+    assert tamanho_aproximado((quadrado, [1.0])) > tamanho_aproximado(quadrado) + tamanho_aproximado([1.0])
+    assert tamanho_aproximado({'a': array}) > array.nbytes
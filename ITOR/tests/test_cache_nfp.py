@@ -0,0 +1,63 @@
+from nfp_tabela import CacheNFP, RegistroPecas, TabelaNFPSimetrica, chaves_canonicas
+
+
+ROTACOES = [0, 1, 2, 3]
+PECAS = [[(0, 0), (2, 0), (2, 1), (0, 1)], [(0, 0), (1, 0), (0, 1)]]
+
+
+def entrada(chave):
+    tipoA, grauA, tipoB, grauB = chave
+    return [[(0.0, 0.0), (float(tipoA + 1), 0.0), (0.0, float(grauB + 1))], [(float(grauA), float(tipoB))]]
+
+
+def cache(diretorio, simetria):
+    return CacheNFP(RegistroPecas(PECAS), ROTACOES, 0, 'decomposicao', 1, diretorio=str(diretorio), simetria=simetria)
+
+
+def test_tabela_completa_ida_e_volta(tmp_path):
+    chaves = [(a, ga, b, gb) for a in range(2) for ga in ROTACOES for b in range(2) for gb in ROTACOES]
+    tabela = {chave: entrada(chave) for chave in chaves}
+    cache(tmp_path, False).salvar(tabela)
+
+    carregada = cache(tmp_path, False).carregar()
+    assert sorted(carregada) == sorted(chaves)
+    for chave in chaves:
+        assert carregada[chave] == tabela[chave]
+
+
+def test_tabela_simetrica_nao_serve_pedido_completo(tmp_path):
+    canonicas = {chave: entrada(chave) for chave in chaves_canonicas(2, ROTACOES)}
+    simetrico = cache(tmp_path, True)
+    simetrico.salvar(TabelaNFPSimetrica(canonicas, PECAS))
+
+    completo = cache(tmp_path, False)
+    assert completo.arquivo != simetrico.arquivo
+    assert completo.carregar() is None
+    assert completo.fontes() == []
+
+    carregada = cache(tmp_path, True).carregar()
+    assert isinstance(carregada, TabelaNFPSimetrica)
+    for chave, valor in canonicas.items():
+        assert carregada[chave] == valor
+
+
+def test_tabela_simetrica_extra_recusada(tmp_path):
+    simetrico = cache(tmp_path / 'base', True)
+    simetrico.salvar(TabelaNFPSimetrica({chave: entrada(chave) for chave in chaves_canonicas(2, ROTACOES)}, PECAS))
+    completo = CacheNFP(RegistroPecas(PECAS), ROTACOES, 0, 'decomposicao', 1, diretorio=str(tmp_path / 'vazio'),
+                        extras=[simetrico.arquivo])
+    assert completo.fontes() == []
+
+
+def test_tabela_simetrica_com_um_tipo_itera_todas_as_rotacoes(tmp_path):
+    pecas = PECAS[:1]
+    canonicas = {chave: entrada(chave) for chave in chaves_canonicas(1, ROTACOES)}
+    todas = sorted((0, ga, 0, gb) for ga in ROTACOES for gb in ROTACOES)
+
+    tabela = TabelaNFPSimetrica(canonicas, pecas, ROTACOES)
+    assert sorted(tabela) == todas
+    assert len(tabela) == len(todas)
+
+    CacheNFP(RegistroPecas(pecas), ROTACOES, 0, 'decomposicao', 1, diretorio=str(tmp_path), simetria=True).salvar(tabela)
+    carregada = CacheNFP(RegistroPecas(pecas), ROTACOES, 0, 'decomposicao', 1, diretorio=str(tmp_path), simetria=True).carregar()
+    assert sorted(carregada) == todas
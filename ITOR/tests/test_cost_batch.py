@@ -0,0 +1,36 @@
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+Knapsack2D = pytest.importorskip('Knapsack2D').Knapsack2D
+from RKO_v3 import RKO
+
+
+def problema(processos_decoder=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Knapsack2D(dataset='fu', processos_decoder=processos_decoder)
+
+
+@pytest.mark.parametrize('processos_decoder', [None, 2])
+def test_cost_batch_igual_a_cost(processos_decoder):
+    chaves = np.random.RandomState(4).random_sample((6, problema().tam_solution))
+    referencia = problema()
+    esperado = [referencia.cost(referencia.decoder(keys)) for keys in chaves]
+
+    env = problema(processos_decoder)
+    try:
+        assert env.cost_batch(chaves).tolist() == esperado
+        assert RKO(env).evaluate_population(chaves) == esperado
+    finally:
+        env.encerrar_lote()
+
+
+def test_lote_so_com_pool_de_decodificacao():
+    assert not RKO(problema()).batch_evaluation
+    assert not RKO(problema(1)).batch_evaluation
+    assert RKO(problema(2)).batch_evaluation
@@ -0,0 +1,50 @@
+import contextlib
+import io
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+Knapsack2D = pytest.importorskip('Knapsack2D').Knapsack2D
+from RKO_v3 import RKO
+
+
+def problema():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Knapsack2D(dataset='fu', tempo=600)
+
+
+def busca_local(limitada):
+    env = problema()
+    rko = RKO(env)
+    rko.bounded_cost = limitada
+    random.seed(7)
+    np.random.seed(7)
+    chaves = rko.random_keys()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(2):
+            chaves = rko.InvertLS(rko.FareyLS(rko.SwapLS(chaves)))
+    return list(chaves), env.cost(env.decoder(chaves))
+
+
+def test_cutoff_devolve_custo_exato_ou_limite():
+    env = problema()
+    rng = np.random.RandomState(3)
+    for _ in range(5):
+        sol = env.decoder(rng.random_sample(env.tam_solution))
+        exato = env.cost(sol)
+        for cutoff in (exato - 5, exato, exato + 0.01, exato + 50):
+            env.dict_sol.clear()
+            valor = env.cost(sol, cutoff=cutoff)
+
+            if valor < cutoff:
+                assert valor == exato
+            else:
+                assert exato >= cutoff
+
+
+def test_busca_local_igual_com_e_sem_cutoff():
+    assert busca_local(True) == busca_local(False)
@@ -0,0 +1,50 @@
+import numpy as np
+from shapely import Polygon
+
+from nfp_tabela import GeometriasNFP, ProvedorNFP, RegistroPecas, TabelaNFPSimetrica, chaves_canonicas
+
+
+ROTACOES = [0, 1, 2, 3]
+PECAS = [[(0, 0), (2, 0), (2, 1), (0, 1)], [(0, 0), (1, 0), (0, 1)]]
+
+
+def calcular(chave, pecas):
+    tipoA, grauA, tipoB, grauB = chave
+    lado = float(1 + tipoA + 2 * grauA + 8 * tipoB + 16 * grauB)
+    return [[(0.0, 0.0), (lado, 0.0), (lado, lado), (0.0, lado)], [(lado, 0.0)]]
+
+
+def test_geometrias_limitadas_pela_capacidade_do_provedor():
+    provedor = ProvedorNFP(calcular, RegistroPecas(PECAS), capacidade=3)
+    geometrias = GeometriasNFP(provedor, capacidade=provedor.capacidade)
+    chaves = [(a, ga, b, gb) for a in range(2) for ga in ROTACOES for b in range(2) for gb in ROTACOES]
+    for chave in chaves:
+        geometrias.id(chave)
+        assert len(geometrias) <= 3
+    assert len(geometrias._bases) <= 4
+
+    ids = [geometrias.id(chave) for chave in chaves[-3:]]
+    nfps, _, pontos = geometrias.transladar(ids, [(1.0, 2.0)] * 3)
+    for chave, nfp, pts in zip(chaves[-3:], nfps, pontos):
+        esperado = calcular(chave, PECAS)
+        assert nfp.equals(Polygon(np.array(esperado[0]) + (1.0, 2.0)))
+        assert pts.tolist() == [[esperado[1][0][0] + 1.0, esperado[1][0][1] + 2.0]]
+
+
+def test_geometrias_sem_capacidade_guardam_todas():
+    tabela = {(0, 0, 1, gb): calcular((0, 0, 1, gb), PECAS) for gb in ROTACOES}
+    geometrias = GeometriasNFP(tabela)
+    geometrias.materializar()
+    assert len(geometrias) == len(tabela)
+    assert geometrias.id((1, 0, 0, 0)) is None
+
+
+def test_derivadas_simetricas_limitadas():
+    canonicas = {chave: calcular(chave, PECAS) for chave in chaves_canonicas(2, ROTACOES)}
+    tabela = TabelaNFPSimetrica(canonicas, PECAS, ROTACOES, capacidade=4)
+    referencia = TabelaNFPSimetrica(canonicas, PECAS, ROTACOES)
+    for _ in range(2):
+        for chave in list(referencia):
+            assert tabela[chave] == referencia[chave]
+            assert len(tabela._derivadas) <= 4
+    assert 0 < len(referencia._derivadas) <= len(canonicas)
@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+
+from RKO_v3 import RKO
+
+
+FAREY = [0.00, 0.142857, 0.166667, 0.20, 0.25, 0.285714, 0.333333, 0.40, 0.428571, 0.50,
+         0.571429, 0.60, 0.666667, 0.714286, 0.75, 0.80, 0.833333, 0.857143, 1.0]
+
+
+class Problema():
+    # 3 chaves discretas (4 valores cada) seguidas de 3 chaves contínuas
+    tam_solution = 6
+    LS_type = 'Best'
+    max_time = 600
+    dict_best = None
+    instance_name = 'teste'
+
+    def __init__(self):
+        self.avaliadas = []
+
+    def buckets_chaves(self):
+        return [4] * 3 + [0] * 3
+
+    def decoder(self, keys):
+        return [int(k * 4) for k in keys[:3]] + [float(k) for k in keys[3:]]
+
+    def cost(self, sol):
+        self.avaliadas.append(tuple(sol))
+        return sum((i + 1) * v for i, v in enumerate(sol))
+
+
+def test_is_noop():
+    rko = RKO(Problema())
+    keys = np.array([0.1, 0.3, 0.6, 0.5, 0.6, 0.7])
+    assert rko.is_noop(keys, 0, 0.2)
+    assert not rko.is_noop(keys, 0, 0.3)
+    assert not rko.is_noop(keys, 3, 0.51)
+
+
+def test_farey_values_visitam_buckets_novos():
+    rko = RKO(Problema())
+    keys = np.array([0.1, 0.3, 0.6, 0.5, 0.6, 0.7])
+    random.seed(3)
+    valores = list(rko.farey_values(keys, 0, FAREY))
+    buckets = [rko.key_bucket(0, valor) for valor in valores]
+    assert len(buckets) == len(set(buckets)) == 3
+    assert rko.key_bucket(0, keys[0]) not in buckets
+    assert len(list(rko.farey_values(keys, 3, FAREY))) == len(FAREY) - 1
+
+
+def test_busca_local_nao_avalia_movimentos_nulos():
+    env = Problema()
+    rko = RKO(env)
+    random.seed(5)
+    keys = np.array([0.1, 0.15, 0.2, 0.5, 0.6, 0.7])
+    rko.SwapLS(keys)
+    assert rko.noop_moves > 0
+    assert env.avaliadas.count(tuple(env.decoder(keys))) == 1
+
+
+def test_shaking_muda_a_solucao_decodificada():
+    rko = RKO(Problema())
+    random.seed(9)
+    keys = np.array([0.1, 0.15, 0.2, 0.5, 0.6, 0.7])
+    for _ in range(20):
+        assert not rko.same_decoding(keys, rko.shaking(keys, 0.1, 0.2))
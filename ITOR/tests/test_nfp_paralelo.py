@@ -0,0 +1,58 @@
+import contextlib
+import hashlib
+import io
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+from nfp_tabela import RegistroPecas, _ler_checkpoint, caminho_binario, caminho_checkpoint, calcular_tabela_paralela, salvar_tabela_nfp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+Knapsack2D = pytest.importorskip('Knapsack2D')
+
+pytestmark = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="requer fork")
+
+ROTACOES = [0, 1]
+PECAS = [
+    [(0, 0), (6, 0), (6, 2), (4, 2), (4, 5), (2, 5), (2, 2), (0, 2)],
+    [(0, 0), (8, 0), (8, 5), (5, 5), (5, 2), (3, 2), (3, 5), (0, 5)],
+    [(0, 0), (2, 0), (2, 2), (0, 2)],
+]
+INTERRUPCAO = (2, 1, 2, 1)
+
+
+def calcular_interrompido(chave):
+    if chave == INTERRUPCAO:
+        raise RuntimeError("interrompido")
+    return Knapsack2D.calcular_entrada_NFP(chave)
+
+
+def bytes_tabela(tabela, caminho):
+    salvar_tabela_nfp(tabela, str(caminho), RegistroPecas(PECAS))
+    with open(caminho_binario(str(caminho)), 'rb') as f:
+        return f.read()
+
+
+def pre_processar(processos=None, checkpoint=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Knapsack2D.pre_processar_NFP(ROTACOES, PECAS, 0, None, processos, checkpoint)
+
+
+def test_tabelas_paralela_e_retomada_identicas_a_serial(tmp_path):
+    serial = bytes_tabela(pre_processar(), tmp_path / 'nfp_serial.txt')
+    paralela = bytes_tabela(pre_processar(2), tmp_path / 'nfp_paralela.txt')
+
+    checkpoint = caminho_checkpoint(str(tmp_path / 'nfp_retomada.txt'))
+    chaves = [(a, ga, b, gb) for a in range(len(PECAS)) for ga in ROTACOES for b in range(len(PECAS)) for gb in ROTACOES]
+    assinatura = ('Knapsack2D', [tuple(map(tuple, peca)) for peca in PECAS], ROTACOES, 0, None)
+    with pytest.raises(RuntimeError), contextlib.redirect_stdout(io.StringIO()):
+        calcular_tabela_paralela(chaves, calcular_interrompido, 1, checkpoint, assinatura,
+                                 Knapsack2D._iniciar_worker_NFP, (PECAS, None), len(PECAS) * len(ROTACOES))
+    feitos = sum(len(lote) for lote, _ in _ler_checkpoint(checkpoint, hashlib.sha1(repr(assinatura).encode()).hexdigest()))
+    assert 0 < feitos < len(chaves)
+
+    retomada = bytes_tabela(pre_processar(2, checkpoint), tmp_path / 'nfp_retomada.txt')
+    assert paralela == serial
+    assert retomada == serial
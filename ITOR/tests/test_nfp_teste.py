@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import MultiPoint, Polygon
+from shapely.ops import unary_union
+
+nfp_teste = pytest.importorskip('nfp_teste')
+
+
+def convexo(rng):
+    pontos = rng.uniform(-10, 10, size=(rng.randint(3, 12), 2)).round(rng.choice([0, 2, 6]))
+    return MultiPoint(pontos).convex_hull
+
+
+def soma_por_fecho(a, b):
+    # implementação anterior: fecho convexo das somas de todos os pares de vértices
+    pontosA = np.asarray(a.exterior.coords)[:-1]
+    pontosB = np.asarray(b.exterior.coords)[:-1]
+    return MultiPoint((pontosA[:, None, :] + pontosB[None, :, :]).reshape(-1, 2)).convex_hull
+
+
+def pares_convexos(n, semente):
+    rng = np.random.RandomState(semente)
+    pares = []
+    while len(pares) < n:
+        a, b = convexo(rng), convexo(rng)
+
+        if isinstance(a, Polygon) and isinstance(b, Polygon):
+            pares.append((a, b))
+    return pares
+
+
+def test_soma_em_lote_igual_ao_fecho_das_somas():
+    pares = pares_convexos(300, 0)
+    for (a, b), soma in zip(pares, nfp_teste.minkowski_sum_convex_lote(pares)):
+        esperado = soma_por_fecho(a, b)
+        assert soma.equals(esperado)
+        assert sorted(soma.exterior.coords[:-1]) == sorted(esperado.exterior.coords[:-1])
+
+
+def test_soma_de_partes_degeneradas_usa_o_fecho():
+    pares = [([(0, 0), (1, 1), (2, 2)], [(0, 0), (1, 0), (0, 1)]), ([(0, 0), (4, 0), (4, 0), (0, 3)], [(0, 0), (1, 0), (1, 1)])]
+    for (a, b), soma in zip(pares, nfp_teste.minkowski_sum_convex_lote(pares)):
+        assert soma.equals(soma_por_fecho(Polygon(a), Polygon(b)))
+
+
+def test_nfp_em_lote_igual_ao_fecho_por_par():
+    partes = [a for a, _ in pares_convexos(12, 1)]
+    fixas, orbitais = partes[:5], partes[5:]
+    nfps = nfp_teste.no_fit_polygon_lote(fixas, orbitais)
+    esperados = [soma_por_fecho(a, Polygon(-np.asarray(b.exterior.coords))) for b in orbitais for a in fixas]
+
+    assert len(nfps) == len(esperados)
+    for nfp, esperado in zip(nfps, esperados):
+        assert nfp.equals(esperado)
+
+
+def partes_convexas(poligono):
+    return list(shapely.get_parts(shapely.constrained_delaunay_triangles(poligono)))
+
+
+def nfp_por_decomposicao(fixo, orbital):
+    # união das somas de Minkowski das partes convexas de A e de -B
+    refletido = Polygon(-np.asarray(orbital.exterior.coords), [-np.asarray(buraco.coords) for buraco in orbital.interiors])
+    return unary_union([soma_por_fecho(a, b) for a in partes_convexas(fixo) for b in partes_convexas(refletido)])
+
+
+L = [(0, 0), (6, 0), (6, 2), (2, 2), (2, 6), (0, 6)]
+T = [(0, 0), (6, 0), (6, 2), (4, 2), (4, 5), (2, 5), (2, 2), (0, 2)]
+ENTALHE = [(0, 0), (8, 0), (8, 5), (5, 5), (5, 2), (3, 2), (3, 5), (0, 5)]
+QUADRADO = [(0, 0), (2, 0), (2, 2), (0, 2)]
+MOLDURA = ([(0, 0), (10, 0), (10, 10), (0, 10)], [[(2, 2), (8, 2), (8, 8), (2, 8)]])
+
+
+@pytest.mark.parametrize('fixo, orbital', [
+    (Polygon(L), Polygon(T)),
+    (Polygon(T), Polygon(L)),
+    (Polygon(ENTALHE), Polygon(QUADRADO)),
+    (Polygon(ENTALHE), Polygon(T)),
+    (Polygon(*MOLDURA), Polygon(QUADRADO)),
+    (Polygon(*MOLDURA), Polygon(L)),
+])
+def test_convolucao_igual_a_uniao_da_decomposicao(fixo, orbital):
+    nfp, pontos = nfp_teste.nfp_convolucao(list(fixo.exterior.coords)[:-1], list(orbital.exterior.coords)[:-1],
+                                           [list(buraco.coords)[:-1] for buraco in fixo.interiors] or None)
+    esperado = nfp_por_decomposicao(fixo, orbital)
+
+    assert nfp.symmetric_difference(esperado).area <= 1e-9 * esperado.area
+    assert len(nfp.interiors) == len(esperado.interiors)
+    for ponto in pontos:
+        assert Polygon(np.asarray(orbital.exterior.coords) + ponto).intersection(fixo).area <= 1e-9 * orbital.area
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+Knapsack2D = pytest.importorskip('Knapsack2D').Knapsack2D
+
+
+def referencia(env):
+    # implementação anterior aos acumuladores: percorre as peças posicionadas
+    tipos_usados = sorted(env.tipos_original[idx] for *_, idx in env.indices_pecas_posicionadas)
+    area_total = sum(env.geometria.areas[tipo] for tipo in tipos_usados)
+    coords = [x for pol in env.pecas_posicionadas for x, _ in pol]
+    larg = max(coords) - min(coords)
+    eficiencia = round((area_total / ((larg / env.escala) * (env.altura / env.escala))) * 100, 2)
+    usada = round((area_total / ((env.base / env.escala) * (env.altura / env.escala))) * 100, 2)
+    return larg, eficiencia, usada
+
+
+def objetivos(verificar):
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = Knapsack2D(dataset='fu', verificar_objetivo=verificar)
+    medidos = []
+    reset = env.reset
+
+    def medir():
+        medidos.append(((env.get_used_width(), env.get_efficiency(), env.area_usada()), referencia(env)))
+        reset()
+
+    env.reset = medir
+    rng = np.random.RandomState(1)
+    custos = [env.cost(env.decoder(rng.random_sample(env.tam_solution))) for _ in range(10)]
+    return custos, medidos
+
+
+def test_objetivos_incrementais_iguais_a_referencia():
+    custos, medidos = objetivos(False)
+    assert len(medidos) == len(custos)
+    for incremental, esperado in medidos:
+        assert incremental == esperado
+
+
+def test_modo_de_verificacao_nao_muda_os_custos():
+    assert objetivos(True) == objetivos(False)
+
+
+def test_modo_de_verificacao_detecta_divergencia():
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = Knapsack2D(dataset='fu', verificar_objetivo=True)
+    env.pack(0, 0, 0)
+    area, *limites = env.acumulados[-1]
+    env.acumulados[-1] = (area + env.geometria.denominador_areas, *limites)
+    with pytest.raises(RuntimeError):
+        env.area_usada()
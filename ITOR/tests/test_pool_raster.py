@@ -0,0 +1,117 @@
+import contextlib
+import io
+import os
+import sys
+from multiprocessing import Manager, Process
+
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+
+from RKO_v3 import SolutionPool, _MS_worker
+
+
+class Problema():
+    # custo exato = -soma ponderada da permutacao; no motor raster o custo sai 0.5 pior
+    def __init__(self):
+        self.tam_solution = 6
+        self.LS_type = 'Best'
+        self.max_time = 1
+        self.dict_best = {'teste': -1000}
+        self.instance_name = 'teste'
+        self.motor_raster = 'raster'
+        self.modo_raster = False
+        self.exato = False
+
+    def decoder(self, keys):
+        return tuple(np.argsort(keys).tolist())
+
+    def cost(self, sol, save=False):
+        self.modo_raster = not self.exato
+        exato = -sum(i * v for i, v in enumerate(sol))
+        return exato + 0.5 if self.modo_raster else exato
+
+    def cost_exato(self, sol):
+        self.exato = True
+        fit = self.cost(sol)
+        self.exato = False
+        return fit
+
+
+def test_pool_do_solve_recebe_so_custos_exatos():
+    env = Problema()
+    manager = Manager()
+    shared = manager.Namespace()
+    shared.best_pair = manager.list([float('inf'), None, None])
+    shared.best_pool = manager.list()
+    shared.pool = SolutionPool(20, shared.best_pool, shared.best_pair, lock=manager.Lock(), env=env)
+    rng = np.random.RandomState(0)
+    for _ in range(20):
+        keys = rng.random_sample(env.tam_solution)
+        shared.pool.insert((env.cost(env.decoder(keys)), list(keys)), 'pool', -1, env=env)
+    pool = shared.pool
+    p = Process(target=_MS_worker, args=(env, pool, 0, False, None))
+    p.start()
+    p.join()
+
+    assert p.exitcode == 0
+    entradas = list(pool.pool)
+    assert entradas
+    for fitness, keys in entradas:
+        assert fitness == env.cost_exato(env.decoder(keys))
+    assert pool.best_pair[0] == entradas[0][0]
+    assert pool.best_pair[0] == env.cost_exato(env.decoder(pool.best_pair[1]))
+
+
+class Contador(Problema):
+
+    def __init__(self):
+        super().__init__()
+        self.exatas = 0
+
+    def cost_exato(self, sol):
+        self.exatas += 1
+        return super().cost_exato(sol)
+
+
+def test_candidata_rejeitada_nao_e_re_decodificada():
+    env = Contador()
+    pool = SolutionPool(3, [], [float('inf'), [], 0], Manager().Lock())
+    for keys in ([0.1, 0.2, 0.3, 0.4, 0.5, 0.6], [0.6, 0.5, 0.4, 0.3, 0.2, 0.1], [0.2, 0.1, 0.3, 0.4, 0.5, 0.6]):
+        pool.insert((env.cost(env.decoder(keys)), keys), 'teste', -1, env=env)
+    assert env.exatas == 3
+    pior = pool.pool[-1][0]
+    keys = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
+    custo = env.cost(env.decoder(keys))
+    assert custo >= pior
+    pool.insert((custo, keys), 'teste', -1, env=env)
+    assert env.exatas == 3
+    assert pool.pool[-1][0] == pior
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+
+
+def test_layouts_raster_validos_na_geometria_exata():
+    Knapsack2D = pytest.importorskip('Knapsack2D').Knapsack2D
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = Knapsack2D(dataset='fu', resolucao_raster=40, tempo_raster=1e9)
+    layouts = []
+    reset = env.reset
+
+    def guardar():
+        layouts.append([Polygon(peca) for peca in env.pecas_posicionadas])
+        reset()
+
+    env.reset = guardar
+    rng = np.random.RandomState(5)
+    for _ in range(5):
+        env.cost(env.decoder(rng.random_sample(env.tam_solution)))
+        assert env.modo_raster
+    for pecas in layouts:
+        assert pecas
+        for i, a in enumerate(pecas):
+            xmin, ymin, xmax, ymax = a.bounds
+            assert xmin >= -1e-6 and ymin >= -1e-6 and xmax <= env.base + 1e-6 and ymax <= env.altura + 1e-6
+            for b in pecas[i + 1:]:
+                assert a.intersection(b).area <= 1e-6 * min(a.area, b.area)
@@ -0,0 +1,90 @@
+import contextlib
+import gc
+import io
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import weakref
+
+import numpy as np
+import pytest
+
+from nfp_tabela import ProvedorNFP, RegistroPecas, carregar_tabela_nfp
+
+
+PECAS = [[(0, 0), (2, 0), (2, 1), (0, 1)], [(0, 0), (1, 0), (0, 1)]]
+UTILS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+
+def calcular(chave, pecas):
+    tipoA, grauA, tipoB, grauB = chave
+    return [[(0.0, 0.0), (float(tipoA + 1), 0.0), (0.0, float(grauB + 1))], [(float(grauA), float(tipoB))]]
+
+
+def consultar(arquivo, chaves):
+    provedor = ProvedorNFP(calcular, RegistroPecas(PECAS), arquivo=arquivo, lote_escrita=1)
+    for chave in chaves:
+        provedor[chave]
+
+
+def test_pendentes_gravados_na_saida(tmp_path):
+    arquivo = str(tmp_path / 'nfp_teste.txt')
+    codigo = (
+        "import sys; sys.path.insert(0, sys.argv[1]); sys.path.insert(0, sys.argv[2])\n"
+        "from test_provedor_nfp import PECAS, calcular\n"
+        "from nfp_tabela import ProvedorNFP, RegistroPecas\n"
+        "provedor = ProvedorNFP(calcular, RegistroPecas(PECAS), arquivo=sys.argv[3])\n"
+        "provedor[(0, 0, 1, 1)]\n"
+        "provedor[(1, 2, 0, 3)]\n"
+    )
+    subprocess.run([sys.executable, '-c', codigo, UTILS_DIR, os.path.dirname(os.path.abspath(__file__)), arquivo],
+                   check=True)
+
+    tabela = carregar_tabela_nfp(arquivo, RegistroPecas(PECAS))
+    assert sorted(tabela) == [(0, 0, 1, 1), (1, 2, 0, 3)]
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="requer fork")
+def test_gravacoes_paralelas_nao_se_sobrescrevem(tmp_path):
+    arquivo = str(tmp_path / 'nfp_teste.txt')
+    grupos = [[(a, ga, b, gb) for b in range(2) for gb in range(4)] for a in range(2) for ga in range(4)]
+    contexto = multiprocessing.get_context('fork')
+    processos = [contexto.Process(target=consultar, args=(arquivo, chaves)) for chaves in grupos]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+        assert processo.exitcode == 0
+
+    tabela = carregar_tabela_nfp(arquivo, RegistroPecas(PECAS))
+    assert sorted(tabela) == sorted(chave for chaves in grupos for chave in chaves)
+
+
+def test_provedor_coletado_grava_pendentes_e_nao_fica_preso(tmp_path):
+    arquivo = str(tmp_path / 'nfp_teste.txt')
+    provedor = ProvedorNFP(calcular, RegistroPecas(PECAS), arquivo=arquivo)
+    provedor[(0, 1, 1, 2)]
+    copia = pickle.loads(pickle.dumps(provedor))
+    copia[(1, 0, 0, 3)]
+    referencias = [weakref.ref(provedor), weakref.ref(copia)]
+    del provedor, copia
+    gc.collect()
+
+    assert [referencia() for referencia in referencias] == [None, None]
+    tabela = carregar_tabela_nfp(arquivo, RegistroPecas(PECAS))
+    assert sorted(tabela) == [(0, 1, 1, 2), (1, 0, 0, 3)]
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'KP', 'code'))
+
+
+def test_estatisticas_do_provedor_nas_estatisticas_do_decoder():
+    Knapsack2D = pytest.importorskip('Knapsack2D').Knapsack2D
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = Knapsack2D(dataset='fu', nfp_sob_demanda=True)
+    env.cost(env.decoder(np.random.RandomState(0).random_sample(env.tam_solution)))
+    nfps = env.estatisticas_caches()['nfps']
+
+    assert nfps['consultas'] == nfps['acertos'] + nfps['acertos_tabela'] + nfps['calculadas'] > 0
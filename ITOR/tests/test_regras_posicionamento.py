@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from regras_posicionamento import REGRAS, avaliar_regras
+
+
+def referencia(posicoes, centro_chapa, centro_layout):
+    # ordenacao por regra, como nos metodos BL/LB/.../NCNFP anteriores
+    centro_nfp = (sum(p[0] for p in posicoes) / len(posicoes), sum(p[1] for p in posicoes) / len(posicoes))
+    chaves = {
+        'BL': lambda p: (p[0], p[1]),
+        'LB': lambda p: (p[1], p[0]),
+        'BR': lambda p: (-p[0], p[1]),
+        'RB': lambda p: (p[1], -p[0]),
+        'UL': lambda p: (p[0], -p[1]),
+        'LU': lambda p: (-p[1], p[0]),
+        'UR': lambda p: (-p[0], -p[1]),
+        'RU': lambda p: (-p[1], -p[0]),
+        'NC': lambda p: math.dist(p, centro_chapa),
+        'NCG': lambda p: math.dist(p, centro_layout if centro_layout is not None else centro_chapa),
+        'NCNFP': lambda p: math.dist(p, centro_nfp),
+    }
+    return {regra: sorted(posicoes, key=chave)[0] for regra, chave in chaves.items()}
+
+
+def candidatos(rng):
+    n = rng.randint(1, 40)
+    tipo = rng.randint(3)
+
+    if tipo == 0:
+        pontos = rng.uniform(0, 100, size=(n, 2))
+    elif tipo == 1:
+        # grade pequena: muitos empates em x, em y e em distancia
+        pontos = rng.randint(0, 5, size=(n, 2)).astype(float)
+    else:
+        # pontos simetricos em torno do centro da chapa (empates nas distancias de NC)
+        metade = rng.randint(0, 4, size=((n + 1) // 2, 2)).astype(float)
+        pontos = np.concatenate((10 + metade, 10 - metade))
+    return [tuple(p) for p in pontos.tolist()]
+
+
+@pytest.mark.parametrize('semente', range(20))
+def test_passada_unica_igual_a_ordenacao_por_regra(semente):
+    rng = np.random.RandomState(semente)
+    for _ in range(50):
+        posicoes = candidatos(rng)
+        centro_chapa = (10.0, 10.0) if rng.randint(2) else (50.0, 25.0)
+        centro_layout = None if rng.randint(3) == 0 else tuple(rng.randint(0, 20, size=2).astype(float))
+        escolhidas = avaliar_regras(posicoes, centro_chapa, centro_layout)
+        esperadas = referencia(posicoes, centro_chapa, centro_layout)
+
+        assert set(escolhidas) == set(REGRAS)
+        for regra in REGRAS:
+            assert escolhidas[regra] is esperadas[regra], (regra, posicoes)
+
+
+def test_sem_posicoes():
+    assert avaliar_regras([], (1, 1)) == dict.fromkeys(REGRAS, [])
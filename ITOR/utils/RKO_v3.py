@@ -21,12 +21,21 @@ class SolutionPool():
         self.best_possible = Best
         self.env = env
         
-    def insert(self, entry_tuple, metaheuristic_name, tag): 
+    def insert(self, entry_tuple, metaheuristic_name, tag, env=None):
         fitness = entry_tuple[0]
         keys = entry_tuple[1]
         # print(f"\rtempo = {round(time.time() - self.start_time,2)} ", end="")
         if self.print:
             print(f'[info] {metaheuristic_name} trying to insert solution with fitness {fitness} into pool, the best solution is {self.best_pair[0]}, at time: {round(self.start_time - time.time(), 2)}s', flush=True)
+        # env e o ambiente do processo que gerou a solucao (self.env e uma copia de quando o pool foi criado);
+        # com motor raster o custo pode ser aproximado, entao a solucao e re-decodificada com o NFP exato
+        # se entraria no pool (custos ja exatos saem da memoria exata do decoder)
+        if getattr(env, 'motor_raster', None) is not None:
+            with self.lock:
+                if len(self.pool) >= self.size and fitness >= self.pool[-1][0]:
+                    return
+            fitness = env.cost_exato(env.decoder(keys))
+            entry_tuple = (fitness, list(keys))
         with self.lock:
             if fitness < self.best_pair[0]: 
                 # self.env.plot(legenda='[]')
@@ -55,6 +64,8 @@ class SolutionPool():
                 self.pool.pop()
 
 class RKO():
+    MAX_NOOP_RETRIES = 10
+
     def __init__(self, env, print_best=False, save_directory=None):
         self.env = env
         self.__MAX_KEYS = self.env.tam_solution
@@ -69,6 +80,16 @@ class RKO():
         
         self.q_managers = {}
 
+        # numero de valores de cada chave no decoder (0 = chave continua), para descartar movimentos que nao mudam a solucao
+        self.key_buckets = list(self.env.buckets_chaves()) if hasattr(self.env, 'buckets_chaves') else None
+        self.noop_moves = 0
+
+        # problemas com limite_custo aceitam cost(..., cutoff=...) e abandonam o decoder quando o vizinho nao pode melhorar
+        self.bounded_cost = hasattr(self.env, 'limite_custo')
+
+        # populacoes so sao avaliadas em lote (cost_batch) quando o problema tem um pool de processos de decodificacao
+        self.batch_evaluation = hasattr(self.env, 'cost_batch') and (getattr(self.env, 'processos_decoder', None) or 0) > 1
+
         # Dentro da classe RKO
     def _setup_parameters(self, metaheuristic_name, params_config):
         is_online = any(len(v) > 1 for v in params_config.values())
@@ -92,13 +113,59 @@ class RKO():
         
     def random_keys(self):
         return np.random.random(self.__MAX_KEYS)        
+
+    def evaluate_population(self, population):
+        # problemas com pool de decodificacao avaliam a populacao inteira de uma vez (cost_batch)
+        if self.batch_evaluation:
+            return [float(cost) for cost in self.env.cost_batch(population)]
+        return [self.env.cost(self.env.decoder(keys)) for keys in population]
     
+    def neighbor_cost(self, keys, best_cost):
+        # custo de um vizinho que so interessa se for menor que best_cost (senao pode voltar so um limite >= best_cost)
+        if self.bounded_cost:
+            return self.env.cost(self.env.decoder(keys), cutoff=best_cost)
+        return self.env.cost(self.env.decoder(keys))
+
+    def key_bucket(self, idx, value):
+        n = self.key_buckets[idx]
+        return int(value * n) if n else value
+
+    def is_noop(self, keys, idx, value):
+        # trocar keys[idx] por value nao muda a saida do decoder
+        return self.key_buckets is not None and self.key_bucket(idx, value) == self.key_bucket(idx, keys[idx])
+
+    def same_decoding(self, keys1, keys2):
+        if self.key_buckets is None:
+            return False
+        return all(self.key_bucket(idx, keys1[idx]) == self.key_bucket(idx, keys2[idx]) for idx in range(self.__MAX_KEYS))
+
+    def farey_values(self, keys, idx, farey_sequence):
+        # um valor por intervalo de Farey; em chaves discretas, so intervalos que levam a um bucket ainda nao visitado
+        n = self.key_buckets[idx] if self.key_buckets is not None else 0
+        visited = {self.key_bucket(idx, keys[idx])} if n else set()
+        for i in range(len(farey_sequence) - 1):
+            lower, upper = farey_sequence[i], farey_sequence[i + 1]
+            if not n:
+                yield random.uniform(lower, upper)
+                continue
+            targets = [b for b in range(int(lower * n), min(n - 1, int(upper * n)) + 1) if b not in visited and b / n < upper]
+            if not targets:
+                self.noop_moves += 1
+                continue
+            target = random.choice(targets)
+            visited.add(target)
+            value = random.uniform(max(lower, target / n), min(upper, (target + 1) / n))
+            if self.key_bucket(idx, value) != target:
+                value = (target + 0.5) / n
+            yield value
+
     def shaking(self, keys, beta_min, beta_max):
         beta = random.uniform(beta_min, beta_max)
         new_keys = copy.deepcopy(keys)
         
         numero_pertubacoes = max(1, int(self.__MAX_KEYS * beta))
-        for _ in range(numero_pertubacoes):
+        for _ in range(numero_pertubacoes * self.MAX_NOOP_RETRIES):
+            previous_keys = copy.copy(new_keys)
             
             tipo = random.choice(['Swap', 'SwapN', 'Invert', 'Random'])
             
@@ -125,6 +192,13 @@ class RKO():
             elif tipo == 'Random':                
                 idx = random.randint(0, self.__MAX_KEYS - 1)
                 new_keys[idx] = random.random()
+
+            if self.same_decoding(previous_keys, new_keys):
+                self.noop_moves += 1
+                continue
+            numero_pertubacoes -= 1
+            if numero_pertubacoes == 0:
+                break
                 
         return new_keys
     
@@ -141,9 +215,13 @@ class RKO():
                     if self.stop_condition(best_cost, metaheuristic_name, -1):
                             return best_keys
 
+                    if self.is_noop(best_keys, idx1, best_keys[idx2]) and self.is_noop(best_keys, idx2, best_keys[idx1]):
+                        self.noop_moves += 1
+                        continue
+
                     new_keys = copy.deepcopy(best_keys)
                     new_keys[idx1], new_keys[idx2] = new_keys[idx2], new_keys[idx1]
-                    new_cost = self.env.cost(self.env.decoder(new_keys))
+                    new_cost = self.neighbor_cost(new_keys, best_cost)
                     
                     if new_cost < best_cost:
                         best_keys = new_keys
@@ -163,9 +241,13 @@ class RKO():
                     if self.stop_condition(best_cost, metaheuristic_name, -1):
                         return best_keys
                         
+                    if self.is_noop(best_keys, idx1, best_keys[idx2]) and self.is_noop(best_keys, idx2, best_keys[idx1]):
+                        self.noop_moves += 1
+                        continue
+
                     new_keys = copy.deepcopy(best_keys)
                     new_keys[idx1], new_keys[idx2] = new_keys[idx2], new_keys[idx1]
-                    new_cost = self.env.cost(self.env.decoder(new_keys))
+                    new_cost = self.neighbor_cost(new_keys, best_cost)
                     
                     if new_cost < best_cost:
                         return new_keys
@@ -184,13 +266,13 @@ class RKO():
             best_cost = self.env.cost(self.env.decoder(best_keys))
             
             for idx in swap_order:
-                for i in range(len(Farey_Squence) - 1):
+                for value in self.farey_values(best_keys, idx, Farey_Squence):
                     if self.stop_condition(best_cost, metaheuristic_name, -1):
                         return best_keys
 
                     new_keys = copy.deepcopy(best_keys)
-                    new_keys[idx] = random.uniform(Farey_Squence[i], Farey_Squence[i+1])
-                    new_cost = self.env.cost(self.env.decoder(new_keys))
+                    new_keys[idx] = value
+                    new_cost = self.neighbor_cost(new_keys, best_cost)
                     
                     if new_cost < best_cost:
                         best_keys = new_keys
@@ -206,13 +288,13 @@ class RKO():
             best_cost = self.env.cost(self.env.decoder(best_keys))
             
             for idx in swap_order:
-                for i in range(len(Farey_Squence) - 1):
+                for value in self.farey_values(best_keys, idx, Farey_Squence):
                     if self.stop_condition(best_cost, metaheuristic_name, -1):
                         return best_keys
                         
                     new_keys = copy.deepcopy(best_keys)
-                    new_keys[idx] = random.uniform(Farey_Squence[i], Farey_Squence[i+1])
-                    new_cost = self.env.cost(self.env.decoder(new_keys))
+                    new_keys[idx] = value
+                    new_cost = self.neighbor_cost(new_keys, best_cost)
                     
                     if new_cost < best_cost:
                         return new_keys
@@ -237,11 +319,15 @@ class RKO():
                 if self.stop_condition(best_cost, metaheuristic_name, -1):
                     return best_keys
 
+                if all(self.is_noop(best_keys, idx, 1 - best_keys[idx]) for idx in block):
+                    self.noop_moves += 1
+                    continue
+
                 new_keys = copy.deepcopy(best_keys)
                 for idx in block:
                     new_keys[idx] = 1 - new_keys[idx]
                 
-                new_cost = self.env.cost(self.env.decoder(new_keys))
+                new_cost = self.neighbor_cost(new_keys, best_cost)
                 
                 if new_cost < best_cost:
                     best_keys = new_keys
@@ -260,9 +346,13 @@ class RKO():
                 if self.stop_condition(best_cost, metaheuristic_name, -1):
                     return best_keys
                         
+                if self.is_noop(best_keys, idx, 1 - best_keys[idx]):
+                    self.noop_moves += 1
+                    continue
+
                 new_keys = copy.deepcopy(best_keys)
                 new_keys[idx] = 1 - new_keys[idx]
-                new_cost = self.env.cost(self.env.decoder(new_keys))
+                new_cost = self.neighbor_cost(new_keys, best_cost)
                     
                 if new_cost < best_cost:
                     return new_keys
@@ -434,7 +524,7 @@ class RKO():
                 not_used_nb = copy.deepcopy(neighborhoods)
                 
                 if pool is not None:
-                    pool.insert((best_cost, list(best_keys)), metaheuristic_name, -1)
+                    pool.insert((best_cost, list(best_keys)), metaheuristic_name, -1, env=self.env)
             else:
                 not_used_nb.remove(current_neighborhood)
             
@@ -453,7 +543,7 @@ class RKO():
         solution = self.env.decoder(keys)
         best_cost = self.env.cost(solution)
         
-        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition( best_cost, metaheuristic_name, tag, pool = pool):
             return [], best_keys, best_cost
             
@@ -471,7 +561,7 @@ class RKO():
                     best_keys = new_keys
                     best_cost = new_cost
                     
-                    pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+                    pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
                 
                 if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
                         return [], best_keys, best_cost
@@ -518,7 +608,7 @@ class RKO():
         s_cost = cost
         best_cost = cost
         
-        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
             return [], best_keys, best_cost
         
@@ -566,7 +656,7 @@ class RKO():
                             best_cost = s_cost
                             best_keys = s
                             improvement_flag = 1
-                            pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+                            pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
                             if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
                                 return [], best_keys, best_cost
                     else:
@@ -582,7 +672,7 @@ class RKO():
                     best_cost = s_cost
                     best_keys = s
                     improvement_flag = 1
-                    pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+                    pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
                     
                 if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
                     return [], best_keys, best_cost
@@ -637,7 +727,7 @@ class RKO():
         best_cost = current_cost # best_cost rastreia o melhor global, current_cost o da iteração
         best_keys = keys
 
-        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
             return [], best_keys, best_cost
 
@@ -679,7 +769,7 @@ class RKO():
                         best_cost = cost
                         best_keys = s2
                         improvement_flag_global = 1
-                        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+                        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
                 else:
                     k += 1
             
@@ -727,7 +817,7 @@ class RKO():
         best_keys = s
         best_cost = s_cost
         
-        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
             return [], best_keys, best_cost
         
@@ -774,7 +864,7 @@ class RKO():
                         if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool): return [], best_keys, best_cost
                         
                         s_line[pos] = random.uniform(Farey_Sequence[j], Farey_Sequence[j+1])
-                        new_cost = self.env.cost(self.env.decoder(s_line))
+                        new_cost = self.neighbor_cost(s_line, rkBestCost)
                         
                         if new_cost < rkBestCost:
                             rkBestCost = new_cost
@@ -795,7 +885,7 @@ class RKO():
                         best_cost = s_cost
                         best_keys = s
                         improvement_flag_cycle = 1
-                        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+                        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
                 else:
                     if random.random() < math.exp(-delta / T):
                         s = s_best_line
@@ -858,14 +948,13 @@ class RKO():
         Gbest_cost = float('inf')
 
         # Avalia a população inicial para definir Pbest e Gbest
-        for i in range(Psize):
-            cost_x = self.env.cost(self.env.decoder(X[i]))
+        for i, cost_x in enumerate(self.evaluate_population(X)):
             Pbest[i] = (cost_x, X[i])
             if cost_x < Gbest_cost:
                 Gbest_cost = cost_x
                 Gbest_keys = X[i]
 
-        pool.insert((Gbest_cost, list(Gbest_keys)), metaheuristic_name, tag)
+        pool.insert((Gbest_cost, list(Gbest_keys)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition(Gbest_cost, metaheuristic_name, tag, pool = pool):
             return [], Gbest_keys, Gbest_cost
         
@@ -895,9 +984,8 @@ class RKO():
                     else: # new_Psize > Psize
                         # Aumenta o enxame com novas partículas aleatórias
                         num_new = new_Psize - Psize
-                        for _ in range(num_new):
-                            new_keys = self.random_keys()
-                            new_cost = self.env.cost(self.env.decoder(new_keys))
+                        new_X = [self.random_keys() for _ in range(num_new)]
+                        for new_keys, new_cost in zip(new_X, self.evaluate_population(new_X)):
                             X.append(new_keys)
                             Pbest.append((new_cost, new_keys))
                             V.append(np.random.random(self.__MAX_KEYS))
@@ -928,19 +1016,27 @@ class RKO():
                         X[i][j] = old_keys[j]
                         V[i][j] = 0.0
 
-                cost_x = self.env.cost(self.env.decoder(X[i]))
-                
-                if cost_x < Pbest[i][0]:
-                    Pbest[i] = (cost_x, X[i])
-                
-                if cost_x < Gbest_cost:
-                    Gbest_cost = cost_x
-                    Gbest_keys = X[i]
-                    improvement_flag = 1
-                    pool.insert((Gbest_cost, list(Gbest_keys)), metaheuristic_name, tag)
-                
-                if cost_x < best_cost_in_generation:
-                    best_cost_in_generation = cost_x
+                # sem pool de decodificacao cada particula e avaliada ao se mover (atualização assíncrona do Gbest);
+                # com pool, o enxame inteiro e avaliado em lote depois da ultima particula (atualização síncrona)
+                if not self.batch_evaluation:
+                    evaluated = [(i, self.env.cost(self.env.decoder(X[i])))]
+                elif i == Psize - 1:
+                    evaluated = list(enumerate(self.evaluate_population(X)))
+                else:
+                    evaluated = []
+
+                for k, cost_x in evaluated:
+                    if cost_x < Pbest[k][0]:
+                        Pbest[k] = (cost_x, X[k])
+                    
+                    if cost_x < Gbest_cost:
+                        Gbest_cost = cost_x
+                        Gbest_keys = X[k]
+                        improvement_flag = 1
+                        pool.insert((Gbest_cost, list(Gbest_keys)), metaheuristic_name, tag, env=self.env)
+                    
+                    if cost_x < best_cost_in_generation:
+                        best_cost_in_generation = cost_x
 
             # Aplica busca local a uma partícula aleatória (como no seu código)
             if Psize > 0:
@@ -955,7 +1051,7 @@ class RKO():
                     Gbest_keys = improved_keys
                     Gbest_cost = improved_cost
                     improvement_flag = 1
-                    pool.insert((Gbest_cost, list(Gbest_keys)), metaheuristic_name, tag)
+                    pool.insert((Gbest_cost, list(Gbest_keys)), metaheuristic_name, tag, env=self.env)
 
             # --- ATUALIZAÇÃO E FEEDBACK PARA O Q-LEARNING ---
             if q_manager:
@@ -1021,9 +1117,9 @@ class RKO():
             best_fitness_in_generation = float('inf')
             improvement_flag = 0
 
-            for key in population:
+            fitnesses = self.evaluate_population(population)
+            for key, fitness in zip(population, fitnesses):
                 sol = self.env.decoder(key)
-                fitness = self.env.cost(sol)
                 evaluated_population.append((key, sol, fitness))
 
                 if fitness < best_fitness_in_generation:
@@ -1033,7 +1129,7 @@ class RKO():
                     best_fitness_overall = fitness
                     best_keys_overall = key
                     improvement_flag = 1
-                    pool.insert((best_fitness_overall, list(best_keys_overall)), metaheuristic_name, tag)
+                    pool.insert((best_fitness_overall, list(best_keys_overall)), metaheuristic_name, tag, env=self.env)
 
                 if self.stop_condition(best_fitness_overall, metaheuristic_name, tag):
                     return [], best_keys_overall, fitness
@@ -1122,7 +1218,7 @@ class RKO():
         best_keys = keys
         best_cost = self.env.cost(self.env.decoder(keys))
         
-        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+        pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool): # Assumindo que stop_condition foi simplificado
             return [], best_keys, best_cost
 
@@ -1154,7 +1250,7 @@ class RKO():
             if cost <= best_cost:
                 best_cost = cost
                 best_keys = s2
-                pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag)
+                pool.insert((best_cost, list(best_keys)), metaheuristic_name, tag, env=self.env)
 
             if self.stop_condition(best_cost, metaheuristic_name, tag, pool = pool):
                 return [], best_keys, best_cost
@@ -1202,15 +1298,14 @@ class RKO():
         best_keys_overall = None
         best_fitness_overall = float('inf')
 
-        for _ in range(pop_size):
-            keys = self.random_keys()
-            cost = self.env.cost(self.env.decoder(keys))
+        initial_keys = [self.random_keys() for _ in range(pop_size)]
+        for keys, cost in zip(initial_keys, self.evaluate_population(initial_keys)):
             population.append({'keys': keys, 'cost': cost})
             if cost < best_fitness_overall:
                 best_fitness_overall = cost
                 best_keys_overall = keys
 
-        pool.insert((best_fitness_overall, list(best_keys_overall)), metaheuristic_name, tag)
+        pool.insert((best_fitness_overall, list(best_keys_overall)), metaheuristic_name, tag, env=self.env)
         if self.stop_condition(best_fitness_overall, metaheuristic_name, tag, pool = pool):
             return [], best_keys_overall, best_fitness_overall
         
@@ -1243,10 +1338,9 @@ class RKO():
                     else: # new_pop_size > pop_size
                         # Aumenta a população com novos indivíduos aleatórios
                         num_new = new_pop_size - pop_size
-                        for _ in range(num_new):
-                            new_keys = self.random_keys()
-                            new_cost = self.env.cost(self.env.decoder(new_keys))
-                            population.append({'keys': new_keys, 'cost': new_cost})
+                        new_keys = [self.random_keys() for _ in range(num_new)]
+                        for keys, new_cost in zip(new_keys, self.evaluate_population(new_keys)):
+                            population.append({'keys': keys, 'cost': new_cost})
                     pop_size = new_pop_size
             # ----------------------------------------------------------
 
@@ -1262,9 +1356,11 @@ class RKO():
             improvement_flag = 0
 
             # Crossover e Mutação
+            children = []
+            leftover = []
             for i in range(0, pop_size, 2):
                 if i + 1 >= len(parents): # Garante que não haja erro com população ímpar
-                    new_population_data.append(parents[i])
+                    leftover.append(parents[i])
                     continue
 
                 parent1_keys, parent2_keys = parents[i]['keys'], parents[i+1]['keys']
@@ -1281,13 +1377,13 @@ class RKO():
                         if random.random() <= prob_mut: child1_keys[j] = random.random()
                         if random.random() <= prob_mut: child2_keys[j] = random.random()
                 
-                cost1 = self.env.cost(self.env.decoder(child1_keys))
-                cost2 = self.env.cost(self.env.decoder(child2_keys))
-                
-                new_population_data.extend([{'keys': child1_keys, 'cost': cost1}, {'keys': child2_keys, 'cost': cost2}])
-                
-                if cost1 < best_of_current_gen_cost: best_of_current_gen_cost = cost1
-                if cost2 < best_of_current_gen_cost: best_of_current_gen_cost = cost2
+                children.extend([child1_keys, child2_keys])
+
+            # Avaliação dos filhos em lote
+            for child_keys, cost in zip(children, self.evaluate_population(children)):
+                new_population_data.append({'keys': child_keys, 'cost': cost})
+                if cost < best_of_current_gen_cost: best_of_current_gen_cost = cost
+            new_population_data.extend(leftover)
 
             # Aplica busca local no melhor indivíduo da nova população
             if new_population_data:
@@ -1316,7 +1412,7 @@ class RKO():
                 best_fitness_overall = current_best_gen_individual['cost']
                 best_keys_overall = current_best_gen_individual['keys']
                 improvement_flag = 1
-                pool.insert((best_fitness_overall, list(best_keys_overall)), metaheuristic_name, tag)
+                pool.insert((best_fitness_overall, list(best_keys_overall)), metaheuristic_name, tag, env=self.env)
                 # print(f"GA {tag} - Geração {num_generations}: Nova melhor solução encontrada: {best_fitness_overall}")
 
             if self.stop_condition(best_fitness_overall, metaheuristic_name, tag, pool = pool):
@@ -1392,7 +1488,7 @@ class RKO():
             for i in range(20):
                 keys = self.random_keys()
                 cost = self.env.cost(self.env.decoder(keys))
-                shared.pool.insert((cost, list(keys)), 'pool', -1)
+                shared.pool.insert((cost, list(keys)), 'pool', -1, env=self.env)
             
             lock = manager.Lock()
             processes = []
@@ -1503,41 +1599,72 @@ class RKO():
 
         return cost, solution, time_elapsed
         
+def _relatar_caches(env, metaheuristic_name, tag, runner=None):
+    if runner is not None:
+        print(f'[moves] {metaheuristic_name} {tag} noop_moves={runner.noop_moves}', flush=True)
+    if not hasattr(env, 'estatisticas_caches'):
+        return
+    for nome, estatisticas in env.estatisticas_caches().items():
+        campos = ', '.join(f'{campo}={round(valor, 3) if isinstance(valor, float) else valor}' for campo, valor in estatisticas.items())
+        print(f'[cache] {metaheuristic_name} {tag} {nome}: {campos}', flush=True)
+
+def _encerrar_lote(env):
+    if hasattr(env, 'encerrar_lote'):
+        env.encerrar_lote()
+
 def _brkga_worker(env, pool,tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.BRKGA(tag, pool)
+    _relatar_caches(env, 'BRKGA', tag, runner)
+    _encerrar_lote(env)
     
 def _MS_worker(env, pool,tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.MultiStart(tag, pool)
+    _relatar_caches(env, 'MS', tag, runner)
+    _encerrar_lote(env)
     
 def _GRASP_worker(env, pool,tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.MultiStart(pool)
+    _relatar_caches(env, 'GRASP', tag, runner)
+    _encerrar_lote(env)
     
 def _VNS_worker(env, limit_time, pool, tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.VNS(limit_time,tag, pool)
+    _relatar_caches(env, 'VNS', tag, runner)
+    _encerrar_lote(env)
     
 def _ILS_worker(env, limit_time,  pool, tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.ILS(limit_time,tag, pool)
+    _relatar_caches(env, 'ILS', tag, runner)
+    _encerrar_lote(env)
     
 def _SA_worker(env, pool,tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.SimulatedAnnealing(tag = tag, pool = pool)
+    _relatar_caches(env, 'SA', tag, runner)
+    _encerrar_lote(env)
     
 def _LNS_worker(env, limit_time, pool, tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.LNS(limit_time=limit_time, tag = tag, pool = pool)
+    _relatar_caches(env, 'LNS', tag, runner)
+    _encerrar_lote(env)
     
 def _PSO_worker(env, pool, tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.PSO(tag = tag, pool = pool)
+    _relatar_caches(env, 'PSO', tag, runner)
+    _encerrar_lote(env)
     
 def _GA_worker(env, pool, tag, print_best, save_directory):
     runner = RKO(env, print_best, save_directory)
     _, local_keys, local_best = runner.GA(tag = tag, pool = pool)
+    _relatar_caches(env, 'GA', tag, runner)
+    _encerrar_lote(env)
     
 
 import random
@@ -0,0 +1,72 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+_ambiente = None
+
+
+def _inicializar(ambiente):
+    global _ambiente
+    _ambiente = ambiente
+
+
+def _avaliar(sol, estado):
+
+    if estado is not None:
+        _ambiente.restaurar_busca(estado)
+    fit = _ambiente.cost(sol)
+    return fit, (_ambiente.estado_busca() if estado is not None else None)
+
+
+class AvaliadorLote():
+    """
+    Pool persistente de processos para avaliar populações de soluções.
+
+    Cada processo recebe uma cópia do problema na criação do pool (por fork,
+    quando disponível, sem serializar a tabela de NFPs) e a mantém entre os
+    lotes, de forma que as memoizações de cada processo continuam quentes de
+    uma geração para a outra. O pool só é criado na primeira avaliação e não
+    é copiado junto com o problema.
+
+    Args:
+        ambiente: Problema (Knapsack2D, SPP2D, ...) usado pelos processos.
+        processos: Número de processos do pool.
+    """
+
+    def __init__(self, ambiente, processos):
+        self.ambiente = ambiente
+        self.processos = processos
+        self.executor = None
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado['executor'] = None
+        return estado
+
+    def avaliar(self, solucoes, estado=None):
+        """
+        Avalia as soluções (já decodificadas) nos processos do pool.
+
+        Args:
+            solucoes: Lista de soluções devolvidas por decoder().
+            estado: Estado da busca (estado_busca()) aplicado em cada processo
+                antes de cada avaliação, ou None se o problema não tem estado
+                entre avaliações.
+
+        Returns:
+            Lista de tuplas (fit, estado_final), na ordem de solucoes.
+        """
+
+        if self.executor is None:
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context('fork' if 'fork' in metodos else None)
+            self.executor = ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto,
+                                                initializer=_inicializar, initargs=(self.ambiente,))
+        tamanho_lote = max(1, len(solucoes) // (4 * self.processos))
+        return list(self.executor.map(_avaliar, solucoes, [estado] * len(solucoes), chunksize=tamanho_lote))
+
+    def fechar(self):
+
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,121 @@
+import atexit
+import hashlib
+import os
+import pickle
+import sqlite3
+import numpy as np
+from nfp_tabela import DIRETORIO_CACHE
+
+
+# Banco de custos compartilhado por KP, SPP e MRCAP (ver CacheCustos).
+ARQUIVO_CUSTOS = os.path.join(DIRETORIO_CACHE, 'custos.sqlite')
+
+
+def impressao_digital(*partes):
+    """
+    Hash que identifica a instância e a versão do decoder (peças, chapa,
+    rotações, margem, motor e versão do NFP, número de regras, ...).
+    """
+    return hashlib.sha1(repr(partes).encode()).hexdigest()
+
+
+def chave_solucao(sol, *extras):
+    """
+    Hash da solução decodificada (e de um estado extra da busca, se houver).
+    """
+    return hashlib.sha1(np.asarray(sol, dtype=np.float64).tobytes() + repr(extras).encode()).digest()
+
+
+class CacheCustos():
+    """
+    Cache de custos em disco (sqlite3), persistente entre execuções.
+
+    Cada entrada é endereçada por (contexto, hash da solução decodificada),
+    em que o contexto é a impressão digital da instância e do decoder; uma
+    mudança nas peças, na chapa ou na versão do NFP cai portanto em outro
+    contexto. As gravações são acumuladas em memória e escritas em lotes
+    (INSERT OR IGNORE), e cada processo abre a sua própria conexão, de forma
+    que os workers do RKO e do pool de avaliação podem usar o mesmo arquivo.
+
+    Args:
+        contexto: Impressão digital da instância (impressao_digital).
+        arquivo: Caminho do banco (padrão ARQUIVO_CUSTOS).
+        tamanho_lote: Número de custos pendentes que dispara uma gravação.
+    """
+
+    def __init__(self, contexto, arquivo=None, tamanho_lote=256):
+        self.contexto = contexto
+        self.arquivo = arquivo or ARQUIVO_CUSTOS
+        self.tamanho_lote = tamanho_lote
+        self.pendentes = {}
+        self.acertos = 0
+        self.falhas = 0
+        self._conexao = None
+        self._pid = None
+        atexit.register(self.descarregar)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado['_conexao'] = None
+        estado['_pid'] = None
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        atexit.register(self.descarregar)
+
+    def conexao(self):
+
+        if self._conexao is None or self._pid != os.getpid():
+            diretorio = os.path.dirname(self.arquivo)
+
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            self._conexao = sqlite3.connect(self.arquivo, timeout=60)
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.execute('CREATE TABLE IF NOT EXISTS custos (contexto TEXT, solucao BLOB, valor BLOB, '
+                                  'PRIMARY KEY (contexto, solucao)) WITHOUT ROWID')
+            self._pid = os.getpid()
+        return self._conexao
+
+    def buscar(self, chave):
+        """
+        Retorna o valor guardado para a chave (chave_solucao) ou None.
+        """
+
+        if chave in self.pendentes:
+            self.acertos += 1
+            return self.pendentes[chave]
+        linha = self.conexao().execute('SELECT valor FROM custos WHERE contexto = ? AND solucao = ?',
+                                       (self.contexto, chave)).fetchone()
+
+        if linha is None:
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        return pickle.loads(linha[0])
+
+    def guardar(self, chave, valor):
+        self.pendentes[chave] = valor
+
+        if len(self.pendentes) >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+
+        if not self.pendentes:
+            return
+        conexao = self.conexao()
+        with conexao:
+            conexao.executemany('INSERT OR IGNORE INTO custos VALUES (?, ?, ?)',
+                                [(self.contexto, chave, pickle.dumps(valor)) for chave, valor in self.pendentes.items()])
+        self.pendentes.clear()
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            'pendentes': len(self.pendentes),
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+        }
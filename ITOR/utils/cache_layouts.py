@@ -0,0 +1,185 @@
+import sys
+from collections import OrderedDict
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+
+# Bytes por elemento das listas do estado: um ponto (tupla de dois floats) ou um número.
+TAMANHO_PONTO = sys.getsizeof((0.0, 0.0)) + 2 * sys.getsizeof(0.0)
+TAMANHO_NUMERO = sys.getsizeof(0.0)
+# Bytes fixos de uma geometria do shapely, além de 16 por coordenada (como em tamanho_aproximado).
+TAMANHO_GEOMETRIA = 64
+
+
+class _No():
+    __slots__ = ('pai', 'chave', 'filhos', 'estado', 'tamanho')
+
+    def __init__(self, pai=None, chave=None):
+        self.pai = pai
+        self.chave = chave
+        self.filhos = {}
+        self.estado = None
+        self.tamanho = 0
+
+
+def tamanho_estado(estado):
+    """
+    Estimativa em bytes da memória de um estado de layout.
+
+    Além dos contêineres, conta os pontos das peças posicionadas e as
+    geometrias do shapely das regiões ocupadas (16 bytes por coordenada, em
+    uma única chamada a get_num_coordinates), que são a maior parte do
+    estado. Peças e regiões são em parte compartilhadas entre estados
+    vizinhos da trie, então a soma fica acima do uso real, do lado seguro.
+    """
+    total = sys.getsizeof(estado)
+    geometrias = []
+    for parte in estado:
+        total += sys.getsizeof(parte)
+
+        if isinstance(parte, dict):
+            for pilha in parte.values():
+                total += sys.getsizeof(pilha)
+
+                if not isinstance(pilha, list):
+                    continue
+                for item in pilha:
+                    total += sys.getsizeof(item)
+                    for valor in item[1:]:
+                        geometrias.extend(valor if isinstance(valor, tuple) else [valor])
+        elif isinstance(parte, list) and parte and isinstance(parte[0], (list, tuple)):
+            for item in parte:
+                total += sys.getsizeof(item) + len(item) * (TAMANHO_PONTO if item and isinstance(item[0], tuple) else TAMANHO_NUMERO)
+        elif isinstance(parte, list):
+            total += len(parte) * TAMANHO_NUMERO
+    geometrias = [geometria for geometria in geometrias if isinstance(geometria, BaseGeometry)]
+
+    if geometrias:
+        total += TAMANHO_GEOMETRIA * len(geometrias) + 16 * int(np.sum(shapely.get_num_coordinates(geometrias)))
+    return total
+
+
+class TrieLayouts():
+    """
+    Trie limitada de layouts parciais, indexada pelo prefixo decodificado.
+
+    Cada nó corresponde a um prefixo de chaves (por exemplo (rotação, regra)
+    de cada peça, na ordem de empacotamento) e pode guardar o estado do layout
+    depois de empacotar esse prefixo. Um decode procura o nó mais profundo com
+    estado e retoma dali, em vez de recomeçar da peça 0. Os estados são
+    descartados em ordem LRU quando a memória estimada passa do limite, e nós
+    que ficam sem estado e sem filhos são removidos.
+
+    Args:
+        capacidade: Limite de memória estimada dos estados, em bytes.
+        tamanho: Função estado -> bytes usada na estimativa.
+    """
+
+    def __init__(self, capacidade=256 * 2**20, tamanho=tamanho_estado):
+        self.capacidade = capacidade
+        self.tamanho = tamanho
+        self.raiz = _No()
+        self.lru = OrderedDict()
+        self.memoria = 0
+        self.acertos = 0
+        self.consultas = 0
+        self.pecas_retomadas = 0
+
+    def __len__(self):
+        return len(self.lru)
+
+    def buscar(self, chaves):
+        """
+        Procura o prefixo mais longo de chaves que tem estado guardado.
+
+        Returns:
+            Tupla (profundidade, estado, no): estado é None (e profundidade 0)
+            se nenhum prefixo estiver na trie; no é o nó do prefixo retomado,
+            a ser passado para guardar().
+        """
+        self.consultas += 1
+        no = self.raiz
+        melhor = (0, None, self.raiz)
+        for profundidade, chave in enumerate(chaves, 1):
+            no = no.filhos.get(chave)
+
+            if no is None:
+                break
+
+            if no.estado is not None:
+                melhor = (profundidade, no.estado, no)
+
+        if melhor[1] is not None:
+            self.acertos += 1
+            self.pecas_retomadas += melhor[0]
+            self.lru.move_to_end(melhor[2])
+        return melhor
+
+    def guardar(self, no, chave, estado):
+        """
+        Guarda o estado do prefixo no + chave e retorna o nó filho.
+        """
+        filho = no.filhos.get(chave)
+
+        if filho is None:
+            filho = _No(no, chave)
+            no.filhos[chave] = filho
+
+        if filho.estado is None and self.capacidade > 0:
+            filho.estado = estado
+            filho.tamanho = self.tamanho(estado)
+            self.memoria += filho.tamanho
+            self.lru[filho] = None
+            self._liberar(filho)
+        return filho
+
+    def _liberar(self, protegido):
+        while self.memoria > self.capacidade and self.lru:
+            no = next(iter(self.lru))
+
+            if no is protegido:
+                break
+            self._descartar(no)
+
+    def _descartar(self, no):
+        del self.lru[no]
+        self.memoria -= no.tamanho
+        no.estado = None
+        no.tamanho = 0
+        while no.pai is not None and not no.filhos and no.estado is None:
+            del no.pai.filhos[no.chave]
+            no = no.pai
+
+    def limpar(self):
+        self.raiz = _No()
+        self.lru.clear()
+        self.memoria = 0
+
+    def estatisticas(self):
+        return {
+            'consultas': self.consultas,
+            'acertos': self.acertos,
+            'pecas_retomadas': self.pecas_retomadas,
+            'estados': len(self.lru),
+            'memoria': self.memoria,
+        }
+
+
+_MASCARA_64 = 2**64 - 1
+
+
+def zobrist(*valores):
+    """
+    Valor pseudoaleatório de 64 bits associado a uma tupla de números.
+
+    Usado como termo do hash incremental (estilo Zobrist) dos layouts: o hash
+    de um layout é o XOR dos termos (profundidade, tipo, grau, x, y) das peças
+    posicionadas, atualizado a cada acao() e desfeito a cada remoção. O hash()
+    de tuplas de números não depende de PYTHONHASHSEED, então os valores são
+    os mesmos em todos os processos; o splitmix64 espalha os bits.
+    """
+    x = (hash(valores) + 0x9E3779B97F4A7C15) & _MASCARA_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+    return x ^ (x >> 31)
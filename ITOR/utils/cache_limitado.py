@@ -0,0 +1,116 @@
+import sys
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+
+def tamanho_aproximado(valor):
+    """
+    Estimativa em bytes de um valor de cache.
+
+    Percorre tuplas, listas, conjuntos e dicionários; geometrias do shapely
+    contam 16 bytes por coordenada e arrays do NumPy o tamanho dos dados.
+    """
+
+    if isinstance(valor, BaseGeometry):
+        return 64 + 16 * int(shapely.get_num_coordinates(valor))
+
+    if isinstance(valor, np.ndarray):
+        return sys.getsizeof(valor) + (0 if valor.base is None else valor.nbytes)
+    total = sys.getsizeof(valor)
+
+    if isinstance(valor, dict):
+        total += sum(tamanho_aproximado(k) + tamanho_aproximado(v) for k, v in valor.items())
+    elif isinstance(valor, (tuple, list, set, frozenset)):
+        total += sum(tamanho_aproximado(v) for v in valor)
+    return total
+
+
+def tamanho_entrada(chave, valor):
+    return tamanho_aproximado(chave) + tamanho_aproximado(valor)
+
+
+class CacheLimitado(MutableMapping):
+    """
+    Dicionário com orçamento de memória e descarte LRU.
+
+    Substitui os dicionários de memoização dos problemas (dict_sol,
+    dict_feasible, dict_nfps). O tamanho de cada entrada (chave + valor) é
+    estimado na inserção; quando a soma passa da capacidade, as entradas usadas
+    há mais tempo são descartadas. Acertos, falhas e descartes são contados
+    para o relatório do fim da execução.
+
+    Args:
+        capacidade: Orçamento de memória estimada, em bytes.
+        tamanho: Função (chave, valor) -> bytes usada na estimativa.
+    """
+
+    def __init__(self, capacidade=256 * 2**20, tamanho=None):
+        self.capacidade = capacidade
+        self.tamanho = tamanho or tamanho_entrada
+        self.dados = OrderedDict()
+        self.memoria = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def __len__(self):
+        return len(self.dados)
+
+    def __iter__(self):
+        return iter(self.dados)
+
+    def __contains__(self, chave):
+
+        if chave in self.dados:
+            return True
+        self.falhas += 1
+        return False
+
+    def __getitem__(self, chave):
+        valor, _ = self.dados[chave]
+        self.dados.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def get(self, chave, padrao=None):
+
+        if chave in self:
+            return self[chave]
+        return padrao
+
+    def __setitem__(self, chave, valor):
+
+        if chave in self.dados:
+            del self[chave]
+        tamanho = self.tamanho(chave, valor)
+
+        if tamanho > self.capacidade:
+            return
+        self.dados[chave] = (valor, tamanho)
+        self.memoria += tamanho
+        while self.memoria > self.capacidade:
+            _, (_, tamanho) = self.dados.popitem(last=False)
+            self.memoria -= tamanho
+            self.descartes += 1
+
+    def __delitem__(self, chave):
+        _, tamanho = self.dados.pop(chave)
+        self.memoria -= tamanho
+
+    def clear(self):
+        self.dados.clear()
+        self.memoria = 0
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            'entradas': len(self.dados),
+            'memoria': self.memoria,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'descartes': self.descartes,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+        }
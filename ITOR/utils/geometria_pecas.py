@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+
+def rotacionar_pontos(pontos, grau_indice):
+    """
+    Versão vetorizada de rot_pol: gira a peça em múltiplos de 90° em torno do
+    primeiro vértice e, se alguma coordenada ficar negativa, desloca a peça de
+    volta para o primeiro quadrante.
+
+    Args:
+        pontos: Array (n, 2) com as coordenadas da peça.
+        grau_indice: Índice da rotação (0 a 3, em múltiplos de 90°).
+
+    Returns:
+        Array (n, 2) com a peça rotacionada.
+    """
+    origem = pontos[0]
+    dx = pontos[:, 0] - origem[0]
+    dy = pontos[:, 1] - origem[1]
+
+    if grau_indice == 0:
+        nx, ny = dx, dy
+    elif grau_indice == 1:
+        nx, ny = -dy, dx
+    elif grau_indice == 2:
+        nx, ny = -dx, -dy
+    elif grau_indice == 3:
+        nx, ny = dy, -dx
+    resultado = np.column_stack((origem[0] + nx, origem[1] + ny))
+    minimos = resultado.min(axis=0)
+    for eixo in range(2):
+
+        if minimos[eixo] < 0:
+            resultado[:, eixo] -= minimos[eixo]
+    return resultado
+
+
+def areas_restantes(regioes, removidos, threads=1):
+    """
+    Área de cada regiao depois de retirar o removido correspondente.
+
+    As diferenças são calculadas de forma vetorizada pelo shapely, que libera
+    o GIL; com threads > 1 os pares são divididos em blocos avaliados em
+    paralelo.
+
+    Args:
+        regioes: Array de polígonos (regiões livres).
+        removidos: Array de polígonos, do mesmo tamanho de regioes.
+        threads: Número de threads.
+
+    Returns:
+        Array com as áreas restantes.
+    """
+    regioes = np.asarray(regioes, dtype=object)
+    removidos = np.asarray(removidos, dtype=object)
+
+    if threads <= 1 or len(regioes) < 2 * threads:
+        return shapely.area(shapely.difference(regioes, removidos))
+    blocos = np.array_split(np.arange(len(regioes)), threads)
+    with ThreadPoolExecutor(threads) as executor:
+        partes = executor.map(lambda bloco: shapely.area(shapely.difference(regioes[bloco], removidos[bloco])), blocos)
+        return np.concatenate(list(partes))
+
+
+class GeometriaPecas():
+    """
+    Geometria pré-calculada de cada tipo de peça em cada rotação.
+
+    Guarda, por (tipo, grau), as coordenadas rotacionadas (array e lista de
+    tuplas), o retângulo envolvente e a envoltória convexa, além da área de
+    cada tipo. As áreas também são guardadas como inteiros sobre um
+    denominador comum (areas_inteiras / denominador_areas), de forma que a
+    área ocupada pode ser somada incrementalmente sem erro de arredondamento
+    e sem depender da ordem das peças. Os IFPs são guardados por (tipo, grau) para o tamanho de chapa
+    atual e descartados quando a chapa muda (por exemplo, a cada novo
+    comprimento de faixa no SPP).
+
+    Args:
+        pecas: Coordenadas de uma peça por tipo, na ordem dos tipos
+            (RegistroPecas.pecas).
+        graus: Índices de rotação a pré-calcular.
+    """
+
+    def __init__(self, pecas, graus=(0, 1, 2, 3)):
+        self.areas = [Polygon(peca).area for peca in pecas]
+        razoes = [area.as_integer_ratio() for area in self.areas]
+        self.denominador_areas = max((denominador for _, denominador in razoes), default=1)
+        self.areas_inteiras = [numerador * (self.denominador_areas // denominador) for numerador, denominador in razoes]
+        self.pontos = {}
+        self.coordenadas = {}
+        self.limites = {}
+        self.cascos = {}
+        self.folha = None
+        self.ifps = {}
+        for tipo, peca in enumerate(pecas):
+            pontos = np.asarray(peca, dtype=float)
+            for grau in graus:
+                rotacionada = rotacionar_pontos(pontos, grau)
+                coordenadas = [tuple(ponto) for ponto in rotacionada.tolist()]
+                minx, miny = rotacionada.min(axis=0).tolist()
+                maxx, maxy = rotacionada.max(axis=0).tolist()
+                self.pontos[tipo, grau] = rotacionada
+                self.coordenadas[tipo, grau] = coordenadas
+                self.limites[tipo, grau] = (minx, miny, maxx, maxy)
+                self.cascos[tipo, grau] = Polygon(coordenadas).convex_hull
+
+    def ifp(self, tipo, grau, base, altura):
+        """
+        Retângulo de posições válidas do ponto de referência da peça dentro da
+        chapa base x altura, ou [] se a peça não cabe nessa rotação.
+        """
+
+        if self.folha != (base, altura):
+            self.folha = (base, altura)
+            self.ifps = {}
+        ifp = self.ifps.get((tipo, grau))
+
+        if ifp is None:
+            minx, miny, maxx, maxy = self.limites[tipo, grau]
+
+            if (maxx - minx) > base or (maxy - miny) > altura:
+                ifp = []
+            else:
+                ifp = [(0 - minx, 0 - miny), (base - maxx, 0 - miny),
+                       (base - maxx, altura - maxy), (0 - minx, altura - maxy)]
+            self.ifps[tipo, grau] = ifp
+        return ifp
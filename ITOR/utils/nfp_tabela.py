@@ -0,0 +1,1055 @@
+import os
+import ast
+import sys
+import struct
+import pickle
+import hashlib
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+import numpy as np
+import shapely
+from shapely import Polygon
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+# Formato binário das tabelas de NFP (.nfpb)
+#
+# Cabeçalho fixo seguido de seções contíguas, todas com itens de 8 bytes
+# (ou múltiplos), de forma que o arquivo inteiro pode ser aberto com
+# numpy.memmap e cada seção vira uma view sem cópia:
+#
+#   offsets_pecas   int64   [n_pecas + 1]
+#   vertices_pecas  float64 [n_vertices, 2]
+#   chaves          int32   [n_entradas, 4]   (pecaA, grauA, pecaB, grauB)
+#   offsets_aneis   int64   [n_entradas + 1]  (primeiro anel = contorno externo)
+#   offsets_coords  int64   [n_aneis + 1]
+#   coords          float64 [n_coords, 2]
+#   offsets_pontos  int64   [n_entradas + 1]
+#   pontos          float64 [n_pontos, 2]     (pontos de encaixe)
+#
+# Com FLAG_SIMETRICA o arquivo guarda apenas as entradas canônicas
+# (tipoA, 0, tipoB, r) e as demais são derivadas por TabelaNFPSimetrica.
+MAGICO = b'NFPB'
+VERSAO_FORMATO = 1
+EXTENSAO_BINARIA = '.nfpb'
+EXTENSAO_CHECKPOINT = '.nfpc'
+FLAG_SIMETRICA = 1
+_CABECALHO = struct.Struct('<4sII6Q4x')
+
+# Cache de NFPs compartilhado por KP, SPP e MRCAP (ver CacheNFP).
+DIRETORIO_CACHE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'NFPs'))
+
+
+def caminho_binario(caminho):
+    """
+    Retorna o caminho do arquivo .nfpb correspondente a um nfp_<dataset>.txt.
+    """
+    return os.path.splitext(caminho)[0] + EXTENSAO_BINARIA
+
+
+def caminho_checkpoint(caminho):
+    """
+    Retorna o caminho do checkpoint (.nfpc) do pré-processamento paralelo.
+    """
+    return os.path.splitext(caminho)[0] + EXTENSAO_CHECKPOINT
+
+
+@contextmanager
+def trava_arquivo(caminho):
+    """
+    Lock exclusivo entre processos sobre <caminho>.lock (flock, ou msvcrt no Windows).
+    """
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(f"{caminho}.lock", 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _secoes(n_pecas, n_vertices, n_entradas, n_aneis, n_coords, n_pontos):
+    return [
+        ('offsets_pecas', np.int64, (n_pecas + 1,)),
+        ('vertices_pecas', np.float64, (n_vertices, 2)),
+        ('chaves', np.int32, (n_entradas, 4)),
+        ('offsets_aneis', np.int64, (n_entradas + 1,)),
+        ('offsets_coords', np.int64, (n_aneis + 1,)),
+        ('coords', np.float64, (n_coords, 2)),
+        ('offsets_pontos', np.int64, (n_entradas + 1,)),
+        ('pontos', np.float64, (n_pontos, 2)),
+    ]
+
+
+def _offsets(tamanhos):
+    offsets = np.zeros(len(tamanhos) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=offsets[1:])
+    return offsets
+
+
+def _como_array(pontos):
+    if pontos is None or len(pontos) == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.asarray(pontos, dtype=np.float64).reshape(-1, 2)
+
+
+def escrever_tabela_binaria(tabela, arquivo, pecas=None, flags=0):
+    """
+    Grava uma tabela de NFPs (dict no formato de pre_processar_NFP) no formato binário.
+
+    Args:
+        tabela: Dicionário {(pecaA, grauA, pecaB, grauB): [coords_nfp, pontos_encaixe]}.
+            Um terceiro elemento opcional com a lista de buracos é preservado.
+        arquivo: Caminho do arquivo .nfpb de saída (escrito de forma atômica).
+        pecas: Lista de peças de um RegistroPecas quando as chaves da tabela
+            são tipos inteiros em vez de tuplas de coordenadas.
+        flags: Bits do cabeçalho (FLAG_SIMETRICA para tabelas canônicas).
+    """
+    id_peca = {}
+    chaves = []
+    aneis = []
+    tamanhos_aneis = []
+    pontos = []
+    if pecas is not None:
+        pecas = [tuple(map(tuple, peca)) for peca in pecas]
+    else:
+        pecas = []
+    for (pecaA, grauA, pecaB, grauB), valor in tabela.items():
+        if isinstance(pecaA, int):
+            ids = [pecaA, pecaB]
+        else:
+            ids = []
+            for peca in (pecaA, pecaB):
+                peca = tuple(map(tuple, peca))
+                if peca not in id_peca:
+                    id_peca[peca] = len(pecas)
+                    pecas.append(peca)
+                ids.append(id_peca[peca])
+        chaves.append((ids[0], grauA, ids[1], grauB))
+        aneis_entrada = [_como_array(valor[0])]
+        if len(valor) > 2 and valor[2]:
+            aneis_entrada.extend(_como_array(buraco) for buraco in valor[2])
+        aneis.extend(aneis_entrada)
+        tamanhos_aneis.append(len(aneis_entrada))
+        pontos.append(_como_array(valor[1]))
+
+    dados = {
+        'offsets_pecas': _offsets([len(p) for p in pecas]),
+        'vertices_pecas': _como_array([v for p in pecas for v in p]),
+        'chaves': np.asarray(chaves, dtype=np.int32).reshape(-1, 4),
+        'offsets_aneis': _offsets(tamanhos_aneis),
+        'offsets_coords': _offsets([len(a) for a in aneis]),
+        'coords': np.concatenate(aneis) if aneis else _como_array([]),
+        'offsets_pontos': _offsets([len(p) for p in pontos]),
+        'pontos': np.concatenate(pontos) if pontos else _como_array([]),
+    }
+    contagens = (len(pecas), len(dados['vertices_pecas']), len(chaves),
+                 len(aneis), len(dados['coords']), len(dados['pontos']))
+
+    diretorio = os.path.dirname(arquivo)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = f"{arquivo}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGICO, VERSAO_FORMATO, flags, *contagens))
+        for nome, dtype, forma in _secoes(*contagens):
+            f.write(np.ascontiguousarray(dados[nome], dtype=dtype).reshape(forma).tobytes())
+    os.replace(temporario, arquivo)
+
+
+class TabelaNFP(Mapping):
+    """
+    Tabela de NFPs somente leitura sobre um arquivo .nfpb mapeado em memória.
+
+    Mantém a mesma interface do dicionário produzido por pre_processar_NFP
+    (chaves (pecaA, grauA, pecaB, grauB) e valores [coords_nfp, pontos_encaixe]),
+    mas as coordenadas só são lidas do disco quando a entrada é consultada, e
+    as páginas do arquivo são compartilhadas entre os processos do RKO.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self._buffer = np.memmap(arquivo, dtype=np.uint8, mode='r')
+        magico, versao, self.flags, *contagens = _CABECALHO.unpack_from(self._buffer, 0)
+        if magico != MAGICO or versao != VERSAO_FORMATO:
+            raise ValueError(f"Arquivo de NFP inválido ou de versão desconhecida: {arquivo}")
+        inicio = _CABECALHO.size
+        for nome, dtype, forma in _secoes(*contagens):
+            tamanho = int(np.prod(forma)) * np.dtype(dtype).itemsize
+            setattr(self, nome, self._buffer[inicio:inicio + tamanho].view(dtype).reshape(forma))
+            inicio += tamanho
+
+        self.pecas = [
+            tuple(map(tuple, self.vertices_pecas[a:b].tolist()))
+            for a, b in zip(self.offsets_pecas[:-1].tolist(), self.offsets_pecas[1:].tolist())
+        ]
+        self._id_peca = {peca: i for i, peca in enumerate(self.pecas)}
+        self._linha = {tuple(chave): i for i, chave in enumerate(self.chaves.tolist())}
+
+    def __len__(self):
+        return len(self._linha)
+
+    def __iter__(self):
+        for a, grauA, b, grauB in self._linha:
+            yield (self.pecas[a], grauA, self.pecas[b], grauB)
+
+    def __contains__(self, chave):
+        return self._linha_da_chave(chave) is not None
+
+    def __getitem__(self, chave):
+        linha = self._linha_da_chave(chave)
+        if linha is None:
+            raise KeyError(chave)
+        return self.entrada(linha)
+
+    def _linha_da_chave(self, chave):
+        try:
+            pecaA, grauA, pecaB, grauB = chave
+            return self._linha.get((self._id_peca[pecaA], grauA, self._id_peca[pecaB], grauB))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def entrada(self, linha):
+        """
+        Reconstrói o valor [coords_nfp, pontos_encaixe(, buracos)] de uma linha da tabela.
+        """
+        a, b = self.offsets_aneis[linha], self.offsets_aneis[linha + 1]
+        aneis = [
+            list(map(tuple, self.coords[self.offsets_coords[i]:self.offsets_coords[i + 1]].tolist()))
+            for i in range(a, b)
+        ]
+        p0, p1 = self.offsets_pontos[linha], self.offsets_pontos[linha + 1]
+        pontos = list(map(tuple, self.pontos[p0:p1].tolist()))
+        if len(aneis) > 1:
+            return [aneis[0], pontos, aneis[1:]]
+        return [aneis[0], pontos]
+
+
+class RegistroPecas():
+    """
+    Registro canônico de tipos de peça.
+
+    Peças com coordenadas idênticas recebem o mesmo tipo inteiro (na ordem da
+    primeira ocorrência), de forma que a tabela de NFPs e os caches do decoder
+    podem ser indexados por (tipoA, grauA, tipoB, grauB) em vez de tuplas com
+    todas as coordenadas das peças.
+    """
+
+    def __init__(self, pecas=()):
+        self.pecas = []
+        self._tipo = {}
+        self.tipos = [self.registrar(peca) for peca in pecas]
+
+    def __len__(self):
+        return len(self.pecas)
+
+    def registrar(self, peca):
+        chave = tuple(map(tuple, peca))
+        tipo = self._tipo.get(chave)
+        if tipo is None:
+            tipo = len(self.pecas)
+            self._tipo[chave] = tipo
+            self.pecas.append(peca)
+        return tipo
+
+    def tipo(self, peca):
+        return self._tipo.get(tuple(map(tuple, peca)))
+
+
+class TabelaNFPTipos(Mapping):
+    """
+    View de uma TabelaNFP indexada pelos tipos de um RegistroPecas.
+
+    Mantém as entradas no arquivo mapeado; apenas o índice
+    (tipoA, grauA, tipoB, grauB) -> linha é construído em memória.
+    """
+
+    def __init__(self, tabela, registro):
+        self.tabela = tabela
+        tipo_da_peca = [registro.tipo(peca) for peca in tabela.pecas]
+        self._linha = {}
+        for linha, (a, grauA, b, grauB) in enumerate(tabela.chaves.tolist()):
+            tipoA, tipoB = tipo_da_peca[a], tipo_da_peca[b]
+            if tipoA is not None and tipoB is not None:
+                self._linha[(tipoA, grauA, tipoB, grauB)] = linha
+
+    def __len__(self):
+        return len(self._linha)
+
+    def __iter__(self):
+        return iter(self._linha)
+
+    def __contains__(self, chave):
+        return chave in self._linha
+
+    def __getitem__(self, chave):
+        return self.tabela.entrada(self._linha[chave])
+
+
+def tabela_por_tipos(tabela, registro):
+    """
+    Reindexa uma tabela de NFPs pelos tipos de registro.
+
+    Aceita tanto tabelas no formato antigo (chaves com as coordenadas das peças,
+    lidas do .txt ou do .nfpb) quanto tabelas já indexadas por tipos, que são
+    devolvidas sem alteração. Entradas de peças que não estão no registro são
+    descartadas.
+    """
+    if isinstance(tabela, TabelaNFP):
+        if tabela.flags & FLAG_SIMETRICA:
+            return TabelaNFPSimetrica(TabelaNFPTipos(tabela, registro), registro.pecas)
+        return TabelaNFPTipos(tabela, registro)
+    if isinstance(tabela, (TabelaNFPTipos, TabelaNFPSimetrica)) or not tabela:
+        return tabela
+    if isinstance(next(iter(tabela))[0], int):
+        return tabela
+    tabela_tipos = {}
+    for (pecaA, grauA, pecaB, grauB), valor in tabela.items():
+        tipoA, tipoB = registro.tipo(pecaA), registro.tipo(pecaB)
+        if tipoA is not None and tipoB is not None:
+            tabela_tipos[(tipoA, grauA, tipoB, grauB)] = valor
+    return tabela_tipos
+
+
+_MATRIZES_ROTACAO = {
+    0: np.array([[1.0, 0.0], [0.0, 1.0]]),
+    1: np.array([[0.0, -1.0], [1.0, 0.0]]),
+    2: np.array([[-1.0, 0.0], [0.0, -1.0]]),
+    3: np.array([[0.0, 1.0], [-1.0, 0.0]]),
+}
+
+
+def rotacionar_peca(pontos, grau):
+    """
+    Rotaciona uma peça em múltiplos de 90° em torno do primeiro vértice.
+
+    Mesma normalização de rot_pol dos solvers: depois da rotação, coordenadas
+    mínimas negativas são deslocadas para 0.
+
+    Args:
+        pontos: Lista de vértices (x, y) da peça.
+        grau: Índice da rotação (0: 0°, 1: 90°, 2: 180°, 3: 270°).
+
+    Returns:
+        Lista com os vértices rotacionados.
+    """
+    px, py = pontos[0]
+    resultado = []
+    for x, y in pontos:
+        dx, dy = x - px, y - py
+
+        if grau == 0:
+            nx, ny = dx, dy
+        elif grau == 1:
+            nx, ny = -dy, dx
+        elif grau == 2:
+            nx, ny = -dx, -dy
+        elif grau == 3:
+            nx, ny = dy, -dx
+        resultado.append([px + nx, py + ny])
+    min_x = min(p[0] for p in resultado)
+    min_y = min(p[1] for p in resultado)
+
+    if min_x < 0 or min_y < 0:
+        resultado = [(x - min_x if min_x < 0 else x,
+                    y - min_y if min_y < 0 else y) for x, y in resultado]
+    return resultado
+
+
+def rotacoes_simetricas(rotacoes):
+    """
+    Indica se o conjunto de rotações permite guardar só as entradas canônicas.
+
+    É preciso que a rotação 0 esteja presente e que a rotação relativa entre
+    quaisquer duas rotações também pertença ao conjunto ([0], [0, 2] e
+    [0, 1, 2, 3] atendem).
+    """
+    rotacoes = set(rotacoes)
+    return 0 in rotacoes and all((b - a) % 4 in rotacoes for a in rotacoes for b in rotacoes)
+
+
+def chaves_canonicas(n_tipos, rotacoes):
+    """
+    Lista as chaves (tipoA, 0, tipoB, r) que bastam para gerar toda a tabela.
+
+    NFP(B, gB, A, gA) é o NFP(A, gA, B, gB) refletido na origem, e rotacionar
+    as duas peças pelo mesmo ângulo só rotaciona o NFP. Basta então guardar
+    tipoA <= tipoB com grauA = 0 e, para tipoA == tipoB, apenas uma das
+    rotações relativas r e -r.
+    """
+    rotacoes = sorted(set(rotacoes))
+    return [
+        (tipoA, 0, tipoB, r)
+        for tipoA in range(n_tipos) for tipoB in range(tipoA, n_tipos) for r in rotacoes
+        if tipoA < tipoB or r <= (-r) % 4
+    ]
+
+
+class TabelaNFPSimetrica(Mapping):
+    """
+    Tabela de NFPs que guarda apenas entradas canônicas e deriva as demais.
+
+    Para NFP = A(gA) ⊕ -B(gB), com as peças normalizadas por rot_pol
+    (rotação R_g mais um deslocamento c(P, g)):
+
+        NFP(A, a, B, b) = R_a(NFP(A, 0, B, b - a) - d(0, b - a)) + d(a, b)
+        NFP(A, a, B, b) = -NFP(B, b, A, a)
+
+    com d(a, b) = c(A, a) - c(B, b). As últimas entradas derivadas ficam em
+    um cache LRU de capacidade entradas (padrão: o número de canônicas).
+
+    As rotações da tabela vêm de rotacoes. Sem elas (tabela lida do disco),
+    são reconstruídas das chaves canônicas mais as rotações relativas opostas,
+    já que para tipoA == tipoB só uma de r e -r é guardada.
+    """
+
+    def __init__(self, canonicas, pecas, rotacoes=None, capacidade=None):
+        self.canonicas = canonicas
+        self.pecas = pecas
+        self.capacidade = len(canonicas) if capacidade is None else capacidade
+
+        if rotacoes is None:
+            rotacoes = {chave[3] for chave in canonicas} | {(-chave[3]) % 4 for chave in canonicas}
+        self.rotacoes = sorted(set(rotacoes))
+        self._deslocamentos = {}
+        self._derivadas = OrderedDict()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        for tipoA in range(len(self.pecas)):
+            for grauA in self.rotacoes:
+                for tipoB in range(len(self.pecas)):
+                    for grauB in self.rotacoes:
+                        chave = (tipoA, grauA, tipoB, grauB)
+                        if chave in self:
+                            yield chave
+
+    def __contains__(self, chave):
+        return self._origem(chave) is not None
+
+    def __getitem__(self, chave):
+        valor = self._derivadas.get(chave)
+        if valor is not None:
+            self._derivadas.move_to_end(chave)
+            return valor
+        origem = self._origem(chave)
+        if origem is None:
+            raise KeyError(chave)
+        base, trocar = origem
+        if base == chave:
+            return self.canonicas[chave]
+        tipoA, grauA, tipoB, grauB = chave
+        if trocar:
+            tipoA, grauA, tipoB, grauB = tipoB, grauB, tipoA, grauA
+        r = base[3]
+        antes = self._deslocamento(tipoA, 0) - self._deslocamento(tipoB, r)
+        depois = self._deslocamento(tipoA, grauA) - self._deslocamento(tipoB, grauB)
+        sinal = -1.0 if trocar else 1.0
+        matriz = _MATRIZES_ROTACAO[grauA % 4].T * sinal
+        deslocamento = depois * sinal
+
+        def transformar(pontos):
+            if not len(pontos):
+                return []
+            pontos = (_como_array(pontos) - antes) @ matriz + deslocamento
+            return list(map(tuple, pontos.tolist()))
+
+        entrada = self.canonicas[base]
+        valor = [transformar(entrada[0]), transformar(entrada[1])]
+        if len(entrada) > 2 and entrada[2]:
+            valor.append([transformar(buraco) for buraco in entrada[2]])
+        self._derivadas[chave] = valor
+        if len(self._derivadas) > self.capacidade:
+            self._derivadas.popitem(last=False)
+        return valor
+
+    def _origem(self, chave):
+        try:
+            tipoA, grauA, tipoB, grauB = chave
+        except (TypeError, ValueError):
+            return None
+        for base, trocar in (((tipoA, 0, tipoB, (grauB - grauA) % 4), False),
+                             ((tipoB, 0, tipoA, (grauA - grauB) % 4), True)):
+            if base in self.canonicas:
+                return base, trocar
+        return None
+
+    def _deslocamento(self, tipo, grau):
+        chave = (tipo, grau)
+        if chave not in self._deslocamentos:
+            peca = self.pecas[tipo]
+            x, y = peca[0]
+            rx, ry = _MATRIZES_ROTACAO[grau % 4] @ np.array([x, y], dtype=np.float64)
+            px, py = rotacionar_peca(peca, grau)[0]
+            self._deslocamentos[chave] = np.array([px - rx, py - ry])
+        return self._deslocamentos[chave]
+
+
+def ler_tabela_txt(caminho):
+    with open(caminho, "r") as f:
+        conteudo = f.read()
+    return ast.literal_eval(conteudo)
+
+
+def converter_tabela_txt(caminho):
+    """
+    Converte um nfp_<dataset>.txt (repr de dicionário) para o formato binário.
+
+    Returns:
+        Caminho do arquivo .nfpb gerado.
+    """
+    destino = caminho_binario(caminho)
+    escrever_tabela_binaria(ler_tabela_txt(caminho), destino)
+    return destino
+
+
+def carregar_tabela_nfp(caminho, registro=None):
+    """
+    Carrega a tabela de NFPs de um dataset, preferindo o formato binário.
+
+    Se existir apenas o .txt antigo, ele é lido uma única vez e convertido para
+    .nfpb ao lado do original, de forma que as próximas execuções abrem a
+    tabela via memmap em vez de ast.literal_eval.
+
+    Args:
+        caminho: Caminho do nfp_<dataset>.txt (o .nfpb é derivado dele).
+        registro: RegistroPecas opcional; quando informado, a tabela é
+            devolvida indexada por (tipoA, grauA, tipoB, grauB).
+
+    Returns:
+        TabelaNFP, dict (se a conversão não pôde ser gravada) ou None se não
+        existir tabela para o dataset.
+    """
+    binario = caminho_binario(caminho)
+    if os.path.exists(binario):
+        tabela = TabelaNFP(binario)
+    elif not os.path.exists(caminho):
+        return None
+    else:
+        tabela = ler_tabela_txt(caminho)
+        try:
+            escrever_tabela_binaria(tabela, binario)
+            tabela = TabelaNFP(binario)
+        except OSError as e:
+            print(f"Não foi possível gravar {binario}: {e}")
+    if registro is not None:
+        return tabela_por_tipos(tabela, registro)
+    return tabela
+
+
+def salvar_tabela_nfp(tabela, caminho, registro=None):
+    """
+    Grava uma tabela recém calculada no formato binário correspondente a caminho.
+
+    Tabelas indexadas por tipos precisam do registro que as gerou, pois o
+    arquivo guarda as coordenadas das peças para poder ser reaproveitado por
+    outras instâncias. De uma TabelaNFPSimetrica só as entradas canônicas são
+    gravadas.
+    """
+    pecas = registro.pecas if registro is not None else None
+    flags = 0
+
+    if isinstance(tabela, TabelaNFPSimetrica):
+        tabela, flags = tabela.canonicas, FLAG_SIMETRICA
+    escrever_tabela_binaria(tabela, caminho_binario(caminho), pecas, flags)
+    checkpoint = caminho_checkpoint(caminho)
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+
+def diferenca_pecas(tabela, registro):
+    """
+    Compara as peças de uma tabela existente com as peças de uma instância.
+
+    Args:
+        tabela: Caminho de um nfp_*.txt/.nfpb ou tabela já carregada.
+        registro: RegistroPecas da nova instância.
+
+    Returns:
+        Tupla (tipos_novos, pecas_removidas): tipos do registro sem entradas
+        na tabela e peças da tabela que não estão no registro.
+    """
+    if isinstance(tabela, str):
+        tabela = carregar_tabela_nfp(tabela)
+    if tabela is None:
+        return list(range(len(registro))), []
+    if isinstance(tabela, TabelaNFP):
+        pecas = tabela.pecas
+    else:
+        pecas = list({tuple(map(tuple, chave[i])): None for chave in tabela for i in (0, 2)})
+    conhecidas = {tuple(map(tuple, peca)) for peca in pecas}
+    tipos_novos = [tipo for tipo, peca in enumerate(registro.pecas) if tuple(map(tuple, peca)) not in conhecidas]
+    pecas_removidas = [peca for peca in pecas if registro.tipo(peca) is None]
+    return tipos_novos, pecas_removidas
+
+
+def _resumo(objeto):
+    return hashlib.sha1(repr(objeto).encode()).hexdigest()[:16]
+
+
+class CacheNFP(Mapping):
+    """
+    Cache de NFPs endereçado pelo conteúdo, compartilhado entre as classes de problema.
+
+    Cada tabela fica em DIRETORIO_CACHE como nfp_<contexto>_<pecas>.nfpb, em que
+    <contexto> é o hash de (rotações, margem, motor, versão do NFP, simetria) e <pecas> o
+    hash das coordenadas das peças únicas. A mesma instância em KP, SPP ou
+    MRCAP cai portanto no mesmo arquivo, e uma instância nova reaproveita os
+    pares de peças já calculados em qualquer outra tabela do mesmo contexto.
+
+    Como Mapping indexado por tipos, procura a chave na tabela exata da
+    instância, depois nas demais tabelas do contexto e por fim nas tabelas
+    extras. Peças removidas da instância simplesmente não são indexadas, e só
+    os pares com tipos novos ficam faltando. Tabelas simétricas (só entradas
+    canônicas, pontos de encaixe derivados) nunca são usadas quando a tabela
+    completa foi pedida.
+
+    Args:
+        registro: RegistroPecas da instância.
+        rotacoes: Rotações permitidas.
+        margem: Margem usada no cálculo dos NFPs.
+        motor: Motor de NFP ('decomposicao' ou 'convolucao').
+        versao: Versão do cálculo de NFP do solver (muda quando entrada_NFP muda).
+        diretorio: Diretório do cache (padrão DIRETORIO_CACHE).
+        extras: Caminhos de tabelas fora do cache usadas como fontes (o
+            nfp_<dataset>.txt antigo, a tabela de um pedido anterior, ...).
+        simetria: Se a tabela pedida guarda só as entradas canônicas
+            (TabelaNFPSimetrica); ignorado se as rotações não permitem.
+    """
+
+    def __init__(self, registro, rotacoes, margem, motor, versao, diretorio=None, extras=(), simetria=False):
+        self.registro = registro
+        self.diretorio = diretorio or DIRETORIO_CACHE
+        self.simetria = bool(simetria and rotacoes_simetricas(rotacoes))
+        self.contexto = _resumo((sorted(set(rotacoes)), margem, motor, versao, self.simetria))
+        pecas = sorted(tuple(map(tuple, peca)) for peca in registro.pecas)
+        self.arquivo = os.path.join(self.diretorio, f"nfp_{self.contexto}_{_resumo(pecas)}{EXTENSAO_BINARIA}")
+        self.extras = list(extras)
+        self._fontes = None
+
+    def carregar(self):
+        """
+        Retorna a tabela exata da instância (indexada por tipos) ou None.
+        """
+        tabela = carregar_tabela_nfp(self.arquivo, self.registro)
+        return tabela if self.aceita(tabela) else None
+
+    def aceita(self, tabela):
+        """
+        Indica se a tabela pode ser usada: uma tabela simétrica só serve quando a simétrica foi pedida.
+        """
+        return self.simetria or not isinstance(tabela, TabelaNFPSimetrica)
+
+    def salvar(self, tabela):
+        salvar_tabela_nfp(tabela, self.arquivo, self.registro)
+        self._fontes = None
+
+    def fontes(self):
+        """
+        Tabelas do contexto que têm pares de peças da instância, na ordem de consulta.
+        """
+        if self._fontes is None:
+            caminhos = []
+            if os.path.isdir(self.diretorio):
+                prefixo = f"nfp_{self.contexto}_"
+                caminhos = sorted(
+                    os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio)
+                    if nome.startswith(prefixo) and nome.endswith(EXTENSAO_BINARIA)
+                )
+                if self.arquivo in caminhos:
+                    caminhos.remove(self.arquivo)
+                    caminhos.insert(0, self.arquivo)
+            caminhos.extend(self.extras)
+            self._fontes = []
+            for caminho in caminhos:
+                try:
+                    tabela = carregar_tabela_nfp(caminho, self.registro)
+                except (OSError, ValueError):
+                    continue
+
+                if tabela is not None and self.aceita(tabela):
+                    self._fontes.append(tabela)
+        return self._fontes
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        vistas = set()
+        for tabela in self.fontes():
+            for chave in tabela:
+                if chave not in vistas:
+                    vistas.add(chave)
+                    yield chave
+
+    def __contains__(self, chave):
+        return any(chave in tabela for tabela in self.fontes())
+
+    def __getitem__(self, chave):
+        for tabela in self.fontes():
+            if chave in tabela:
+                return tabela[chave]
+        raise KeyError(chave)
+
+    def buscar(self, chaves):
+        """
+        Retorna {chave: entrada} para as chaves que já estão em alguma tabela do cache.
+        """
+        if not self.fontes():
+            return {}
+        return {chave: self[chave] for chave in chaves if chave in self}
+
+
+def _gravar_pendentes(arquivo, registro, pendentes):
+    """
+    Grava as entradas de pendentes no .nfpb de arquivo (sob o lock) e esvazia pendentes.
+    """
+    if arquivo is None or not pendentes:
+        return
+    try:
+        with trava_arquivo(caminho_binario(arquivo)):
+            atual = carregar_tabela_nfp(arquivo, registro)
+            tabela = dict(atual.items()) if atual is not None else {}
+            tabela.update(pendentes)
+            salvar_tabela_nfp(tabela, arquivo, registro)
+        pendentes.clear()
+    except OSError as e:
+        print(f"Não foi possível gravar {caminho_binario(arquivo)}: {e}")
+
+
+class ProvedorNFP():
+    """
+    Fornece NFPs sob demanda, sem pré-processar a tabela inteira.
+
+    Cada consulta procura primeiro em um cache LRU limitado, depois na tabela
+    carregada do disco (se houver) e, por fim, calcula a entrada com
+    calcular(chave, pecas). Entradas calculadas podem ser gravadas de volta no
+    .nfpb do dataset em lotes (write-through), mesclando com o que outros
+    processos já tiverem gravado. A leitura, a mescla e a gravação acontecem
+    sob um lock do arquivo, e as entradas que sobram no último lote são
+    gravadas por um salvar() explícito, quando o provedor é coletado ou na
+    saída do processo (weakref.finalize).
+
+    Args:
+        calcular: Função de nível de módulo (chave, pecas) -> [coords_nfp, pontos_encaixe].
+        registro: RegistroPecas que define os tipos das chaves.
+        tabela: Tabela já existente (indexada por tipos) ou None.
+        capacidade: Número máximo de entradas mantidas no cache.
+        arquivo: nfp_<dataset>.txt cujo .nfpb recebe as entradas calculadas;
+            None desativa a escrita.
+        lote_escrita: Número de entradas novas acumuladas antes de gravar.
+    """
+
+    def __init__(self, calcular, registro, tabela=None, capacidade=100000, arquivo=None, lote_escrita=500):
+        self.calcular = calcular
+        self.registro = registro
+        self.tabela = tabela
+        self.capacidade = capacidade
+        self.arquivo = arquivo
+        self.lote_escrita = lote_escrita
+        self.cache = OrderedDict()
+        self.pendentes = {}
+        self.acertos = 0
+        self.acertos_tabela = 0
+        self.calculadas = 0
+        self._finalizar = weakref.finalize(self, _gravar_pendentes, self.arquivo, self.registro, self.pendentes)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_finalizar']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._finalizar = weakref.finalize(self, _gravar_pendentes, self.arquivo, self.registro, self.pendentes)
+
+    def get(self, chave, padrao=None):
+        valor = self.cache.get(chave)
+
+        if valor is not None:
+            self.cache.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+        if self.tabela is not None and chave in self.tabela:
+            valor = self.tabela[chave]
+            self.acertos_tabela += 1
+        else:
+            valor = self.calcular(chave, self.registro.pecas)
+            self.calculadas += 1
+
+            if self.arquivo is not None:
+                self.pendentes[chave] = valor
+
+                if len(self.pendentes) >= self.lote_escrita:
+                    self.salvar()
+        self.cache[chave] = valor
+
+        if len(self.cache) > self.capacidade:
+            self.cache.popitem(last=False)
+        return valor
+
+    def __getitem__(self, chave):
+        valor = self.get(chave)
+        if valor is None:
+            raise KeyError(chave)
+        return valor
+
+    def __contains__(self, chave):
+        return self.get(chave) is not None
+
+    def salvar(self):
+        """
+        Grava as entradas calculadas no .nfpb, mesclando com o arquivo atual.
+        """
+        _gravar_pendentes(self.arquivo, self.registro, self.pendentes)
+
+    def estatisticas(self):
+        consultas = self.acertos + self.acertos_tabela + self.calculadas
+        return {
+            'consultas': consultas,
+            'acertos': self.acertos,
+            'acertos_tabela': self.acertos_tabela,
+            'calculadas': self.calculadas,
+            'taxa_acerto': (self.acertos + self.acertos_tabela) / consultas if consultas else 0.0,
+            'em_cache': len(self.cache),
+        }
+
+
+class GeometriasNFP():
+    """
+    Polígonos shapely das entradas de uma tabela de NFPs, construídos uma única vez.
+
+    Cada par (tipoA, grauA, tipoB, grauB) recebe um id na primeira consulta e
+    passa a ter, em arrays paralelos, o polígono base, o polígono encolhido
+    (buffer(-encolhimento), usado na união da região ocupada) e os pontos de
+    encaixe. transladar() posiciona os NFPs de um layout inteiro com uma
+    única chamada a shapely.transform por array.
+
+    Com capacidade, só os pares consultados por último são mantidos (LRU,
+    como no ProvedorNFP); o id de um par descartado é reaproveitado pelo
+    próximo par novo, então ids só valem até a próxima consulta de pares novos
+    em número maior que a capacidade.
+
+    Args:
+        tabela: Tabela de NFPs indexada por tipos (dict, TabelaNFP, ProvedorNFP...).
+        encolhimento: Distância do buffer negativo dos polígonos encolhidos.
+        capacidade: Número máximo de pares mantidos, ou None para manter todos.
+    """
+
+    def __init__(self, tabela, encolhimento=0.000001, capacidade=None):
+        self.tabela = tabela
+        self.encolhimento = encolhimento
+        self.capacidade = capacidade
+        self._id = OrderedDict()
+        self._livres = []
+        self._bases = []
+        self._encolhidos = []
+        self._pontos = []
+        self._arrays = None
+
+    def __len__(self):
+        return len(self._bases) - len(self._livres)
+
+    def materializar(self, chaves=None):
+        """
+        Constrói de uma vez as geometrias de todas as chaves da tabela (ou das informadas).
+        """
+        self._adicionar([chave for chave in (self.tabela if chaves is None else chaves) if chave not in self._id])
+
+    def id(self, chave):
+        """
+        Retorna o id do par, ou None se a tabela não tem NFP (ou tem NFP vazio) para ele.
+        """
+        if chave not in self._id:
+            self._adicionar([chave])
+        elif self.capacidade is not None:
+            self._id.move_to_end(chave)
+        return self._id[chave]
+
+    def _adicionar(self, chaves):
+        ids = []
+        for chave in chaves:
+            entrada = self.tabela.get(chave)
+            base = Polygon(entrada[0], entrada[2] if len(entrada) > 2 else None) if entrada else None
+
+            if base is None or base.is_empty:
+                self._id[chave] = None
+                continue
+
+            if self._livres:
+                id_nfp = self._livres.pop()
+            else:
+                id_nfp = len(self._bases)
+                self._bases.append(None)
+                self._encolhidos.append(None)
+                self._pontos.append(None)
+            self._id[chave] = id_nfp
+            self._bases[id_nfp] = base
+            self._pontos[id_nfp] = _como_array(entrada[1])
+            ids.append(id_nfp)
+
+        if ids:
+            encolhidos = shapely.buffer([self._bases[i] for i in ids], -self.encolhimento, quad_segs=16).tolist()
+            for id_nfp, encolhido in zip(ids, encolhidos):
+                self._encolhidos[id_nfp] = encolhido
+            self._arrays = None
+
+        if self.capacidade is not None:
+            while len(self._id) > self.capacidade:
+                _, id_nfp = self._id.popitem(last=False)
+
+                if id_nfp is not None:
+                    self._livres.append(id_nfp)
+
+    def arrays(self):
+        """
+        Arrays (bases, encolhidos, n_coords_bases, n_coords_encolhidos) indexados por id.
+        """
+        if self._arrays is None:
+            bases = np.empty(len(self._bases), dtype=object)
+            bases[:] = self._bases
+            encolhidos = np.empty(len(self._encolhidos), dtype=object)
+            encolhidos[:] = self._encolhidos
+            self._arrays = (bases, encolhidos, shapely.get_num_coordinates(bases),
+                            shapely.get_num_coordinates(encolhidos))
+        return self._arrays
+
+    def transladar(self, ids, deslocamentos):
+        """
+        Posiciona os NFPs de ids nos deslocamentos (x, y) correspondentes.
+
+        Returns:
+            Tupla (nfps, encolhidos, pontos): arrays de polígonos transladados
+            e lista com os pontos de encaixe transladados de cada NFP.
+        """
+        bases, encolhidos, n_bases, n_encolhidos = self.arrays()
+        ids = np.asarray(ids, dtype=np.int64)
+        deslocamentos = np.asarray(deslocamentos, dtype=np.float64).reshape(-1, 2)
+        d_bases = np.repeat(deslocamentos, n_bases[ids], axis=0)
+        d_encolhidos = np.repeat(deslocamentos, n_encolhidos[ids], axis=0)
+        nfps = shapely.transform(bases[ids], lambda coords: coords + d_bases)
+        encolhidos = shapely.transform(encolhidos[ids], lambda coords: coords + d_encolhidos)
+        pontos = [self._pontos[i] + d for i, d in zip(ids.tolist(), deslocamentos)]
+        return nfps, encolhidos, pontos
+
+
+def _ler_checkpoint(checkpoint, assinatura):
+    lotes = []
+    if not os.path.exists(checkpoint):
+        return lotes
+    with open(checkpoint, 'rb') as f:
+        try:
+            if pickle.load(f) != assinatura:
+                return []
+            while True:
+                lotes.append(pickle.load(f))
+        except (EOFError, pickle.UnpicklingError, ValueError):
+            pass
+    return lotes
+
+
+def _calcular_lote(calcular, chaves):
+    return [calcular(chave) for chave in chaves]
+
+
+def calcular_tabela_paralela(chaves, calcular, processos=None, checkpoint=None,
+                             assinatura=None, inicializador=None, args_inicializador=(),
+                             tamanho_lote=64):
+    """
+    Calcula as entradas de uma tabela de NFPs em um pool de processos.
+
+    O espaço de chaves é dividido em lotes contíguos distribuídos entre os
+    processos. Cada lote concluído é anexado ao checkpoint, de forma que uma
+    execução interrompida retoma apenas os lotes que faltam. A tabela final é
+    montada na ordem de chaves, ficando idêntica à do cálculo serial.
+
+    Args:
+        chaves: Lista ordenada de chaves (tipoA, grauA, tipoB, grauB).
+        calcular: Função de nível de módulo chave -> [coords_nfp, pontos_encaixe].
+        processos: Número de processos (None usa os.cpu_count()).
+        checkpoint: Caminho do arquivo de resultados parciais (opcional).
+        assinatura: Objeto que identifica o problema (peças, rotações, margem);
+            um checkpoint com assinatura diferente é descartado.
+        inicializador: Função executada em cada processo antes dos lotes.
+        args_inicializador: Argumentos de inicializador.
+        tamanho_lote: Número de chaves por lote.
+
+    Returns:
+        Dicionário {chave: entrada} na ordem de chaves.
+    """
+    assinatura = hashlib.sha1(repr(assinatura).encode()).hexdigest()
+    feitos = {}
+    arquivo = None
+    if checkpoint is not None:
+        lotes = _ler_checkpoint(checkpoint, assinatura)
+        diretorio = os.path.dirname(checkpoint)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{checkpoint}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(assinatura, f)
+            for lote in lotes:
+                pickle.dump(lote, f)
+        os.replace(temporario, checkpoint)
+        for lote_chaves, lote_valores in lotes:
+            feitos.update(zip(lote_chaves, lote_valores))
+        arquivo = open(checkpoint, 'ab')
+
+    pendentes = [chave for chave in chaves if chave not in feitos]
+    lotes = [pendentes[i:i + tamanho_lote] for i in range(0, len(pendentes), tamanho_lote)]
+    total = len(chaves)
+    try:
+        with ProcessPoolExecutor(max_workers=processos, initializer=inicializador,
+                                 initargs=args_inicializador) as executor:
+            futuros = {executor.submit(_calcular_lote, calcular, lote): lote for lote in lotes}
+            for futuro in as_completed(futuros):
+                lote = futuros[futuro]
+                valores = futuro.result()
+                feitos.update(zip(lote, valores))
+
+                if arquivo is not None:
+                    pickle.dump((lote, valores), arquivo)
+                    arquivo.flush()
+                    os.fsync(arquivo.fileno())
+                porcentagem = (len(feitos) / total) * 100
+                print(f"\rPré-processando NFPs: {porcentagem:.1f}% concluído", end="")
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+    return {chave: feitos[chave] for chave in chaves}
+
+
+if __name__ == '__main__':
+    # Conversão única dos nfp_*.txt existentes:
+    #   python nfp_tabela.py ../KP/code/NFPs ../SPP/code/NFPs
+    for alvo in sys.argv[1:]:
+        arquivos = [alvo] if os.path.isfile(alvo) else [
+            os.path.join(alvo, nome) for nome in sorted(os.listdir(alvo))
+            if nome.startswith('nfp_') and nome.endswith('.txt')
+        ]
+        for arquivo in arquivos:
+            destino = converter_tabela_txt(arquivo)
+            print(f"{arquivo} -> {destino} ({os.path.getsize(arquivo)} -> {os.path.getsize(destino)} bytes)")
@@ -8,6 +8,8 @@ builtins.xrange = range
 from poly_decomp.poly_decomp import polygonQuickDecomp
 from shapely.geometry import Polygon, MultiPoint
 from shapely import affinity
+from shapely.geometry.polygon import orient
+import shapely
 
 
 
@@ -110,14 +112,305 @@ def minkowski_sum_convex(polygonA, polygonB):
     Calcula a soma de Minkowski para dois polígonos CONVEXOS.
     Retorna um objeto Polygon do Shapely.
     """
-    sum_conv = []
-    # Itera sobre todos os pares de vértices e os soma
-    for p1 in polygonA.exterior.coords:
-        for p2 in polygonB.exterior.coords:
-            sum_conv.append((p1[0] + p2[0], p1[1] + p2[1]))
-            
-    # O fecho convexo da soma dos vértices é a Soma de Minkowski
+    return minkowski_sum_convex_lote([(polygonA, polygonB)])[0]
+
+
+def _minkowski_sum_hull(pontosA, pontosB):
+    # Soma de todos os pares de vértices seguida do fecho convexo (O(n·m)).
+    # Usada quando alguma das partes não é um polígono convexo válido.
+    sum_conv = (pontosA[:, None, :] + pontosB[None, :, :]).reshape(-1, 2)
     return MultiPoint(sum_conv).convex_hull
+
+
+def _coords_parte(parte):
+    if hasattr(parte, 'exterior'):
+        parte = parte.exterior.coords
+    return np.asarray(parte, dtype=np.float64).reshape(-1, 2)
+
+
+def _girar(valores, k):
+    # Equivalente a np.roll(valores, -k, axis=0), sem o custo genérico de np.roll.
+    return np.concatenate((valores[k:], valores[:k]))
+
+
+def _normalizar_convexo(pontos):
+    """
+    Prepara uma parte convexa para a soma por intercalação de arestas.
+
+    Remove vértices repetidos (inclusive o de fechamento), orienta no sentido
+    anti-horário e começa pelo vértice mais baixo (e mais à esquerda).
+
+    Returns:
+        Tupla (vertices, angulos_arestas) ou None se a parte for degenerada
+        ou não convexa.
+    """
+    if len(pontos) > 1 and np.array_equal(pontos[0], pontos[-1]):
+        pontos = pontos[:-1]
+    if len(pontos) > 1:
+        repetidos = np.all(pontos == _girar(pontos, -1), axis=1)
+        pontos = pontos[~repetidos] if not repetidos.all() else pontos[:1]
+    if len(pontos) < 3:
+        return None
+    x, y = pontos[:, 0], pontos[:, 1]
+    area = np.dot(x, _girar(y, 1)) - np.dot(_girar(x, 1), y)
+    if area == 0:
+        return None
+    if area < 0:
+        pontos = pontos[::-1]
+    arestas = _girar(pontos, 1) - pontos
+    proximas = _girar(arestas, 1)
+    giros = arestas[:, 0] * proximas[:, 1] - arestas[:, 1] * proximas[:, 0]
+    if (giros < 0).any():
+        return None
+    inicio = np.lexsort((pontos[:, 0], pontos[:, 1]))[0]
+    pontos = _girar(pontos, inicio)
+    arestas = _girar(arestas, inicio)
+    angulos = np.arctan2(arestas[:, 1], arestas[:, 0])
+    angulos = np.where(angulos < 0, angulos + 2 * np.pi, angulos)
+    return pontos, angulos
+
+
+def minkowski_sum_convex_lote(pares, normalizados=None):
+    """
+    Soma de Minkowski de vários pares de polígonos convexos de uma só vez.
+
+    Para cada par, as arestas de A e de B (ambos anti-horários, começando no
+    vértice mais baixo) são intercaladas por ângulo polar, o que dá os
+    vértices da soma em O(n+m) sem gerar os n·m pontos nem calcular um fecho
+    convexo. A intercalação de todos os pares é feita com um único lexsort e
+    os polígonos são criados em lote com shapely.polygons. Os vértices são
+    somas exatas A[i] + B[j] e o anel sai no mesmo formato do convex_hull
+    (horário, a partir do vértice mais baixo, sem vértices colineares).
+    Pares com alguma parte não convexa ou degenerada usam o fecho convexo.
+
+    Args:
+        pares: Lista de pares (A, B), cada um Polygon ou lista de vértices.
+        normalizados: Lista opcional com os pares já passados por
+            _normalizar_convexo, para não repetir a normalização de partes
+            usadas em vários pares.
+
+    Returns:
+        Lista de Polygon, na ordem de pares.
+    """
+    resultado = [None] * len(pares)
+    if normalizados is None:
+        normalizados = [(_normalizar_convexo(_coords_parte(a)), _normalizar_convexo(_coords_parte(b)))
+                        for a, b in pares]
+    validos = []
+    for k, (a, b) in enumerate(normalizados):
+        if a is None or b is None:
+            resultado[k] = _minkowski_sum_hull(_coords_parte(pares[k][0]), _coords_parte(pares[k][1]))
+        else:
+            validos.append(k)
+    if not validos:
+        return resultado
+
+    verticesA = [normalizados[k][0][0] for k in validos]
+    verticesB = [normalizados[k][1][0] for k in validos]
+    tamA = np.array([len(v) for v in verticesA])
+    tamB = np.array([len(v) for v in verticesB])
+    offA = np.concatenate(([0], np.cumsum(tamA)[:-1]))
+    offB = np.concatenate(([0], np.cumsum(tamB)[:-1]))
+    todosA = np.concatenate(verticesA)
+    todosB = np.concatenate(verticesB)
+    n_pares = len(validos)
+    tam = tamA + tamB
+    grupo = np.repeat(np.arange(n_pares), tam)
+    inicio_grupo = np.concatenate(([0], np.cumsum(tam)[:-1]))
+
+    # Arestas de A e de B de cada par, ordenadas por (par, ângulo, origem, índice).
+    angulos = np.concatenate([np.concatenate((normalizados[k][0][1], normalizados[k][1][1])) for k in validos])
+    origem = np.concatenate([np.repeat([0, 1], [a, b]) for a, b in zip(tamA, tamB)])
+    indice = np.arange(len(grupo)) - inicio_grupo[grupo]
+    ordem = np.lexsort((indice, origem, angulos, grupo))
+    de_a = (origem[ordem] == 0).astype(np.int64)
+
+    # O vértice t de cada par é A[i] + B[j], com i e j = arestas de A e de B
+    # já percorridas antes da aresta t.
+    acumA = np.cumsum(de_a) - de_a
+    acumB = np.cumsum(1 - de_a) - (1 - de_a)
+    primeiro = inicio_grupo[grupo]
+    i = acumA - acumA[primeiro]
+    j = acumB - acumB[primeiro]
+    i = np.where(i >= tamA[grupo], i - tamA[grupo], i)
+    j = np.where(j >= tamB[grupo], j - tamB[grupo], j)
+    vertices = todosA[offA[grupo] + i] + todosB[offB[grupo] + j]
+
+    # Remove vértices colineares (arestas paralelas de A e B).
+    posicao = np.arange(len(grupo)) - primeiro
+    anterior = np.where(posicao == 0, primeiro + tam[grupo] - 1, np.arange(len(grupo)) - 1)
+    seguinte = np.where(posicao == tam[grupo] - 1, primeiro, np.arange(len(grupo)) + 1)
+    ida = vertices - vertices[anterior]
+    volta = vertices[seguinte] - vertices
+    giro = ida[:, 0] * volta[:, 1] - ida[:, 1] * volta[:, 0]
+    manter = giro > 0
+    vertices, grupo, posicao = vertices[manter], grupo[manter], posicao[manter]
+    mantidos = np.bincount(grupo, minlength=n_pares)
+    degenerados = mantidos < 3
+
+    # Anel horário a partir do vértice inicial, como o convex_hull do GEOS.
+    rank = np.arange(len(grupo)) - np.concatenate(([0], np.cumsum(mantidos)[:-1]))[grupo]
+    nova_posicao = (mantidos[grupo] - rank) % mantidos[grupo]
+    ordem = np.lexsort((nova_posicao, grupo))
+    vertices, grupo = vertices[ordem], grupo[ordem]
+    usar = ~degenerados[grupo]
+    if usar.any():
+        aneis = shapely.linearrings(vertices[usar], indices=grupo[usar])
+        poligonos = shapely.polygons(aneis)
+        for g, poligono in zip(np.flatnonzero(~degenerados), poligonos):
+            resultado[validos[g]] = poligono
+    for g in np.flatnonzero(degenerados):
+        k = validos[g]
+        resultado[k] = _minkowski_sum_hull(_coords_parte(pares[k][0]), _coords_parte(pares[k][1]))
+    return resultado
+
+
+def no_fit_polygon_lote(partes_fixas, partes_orbitais):
+    """
+    NFPs de todas as combinações entre partes convexas de A (fixo) e B (orbital).
+
+    Cada parte é normalizada uma única vez e todas as somas de Minkowski
+    A ⊕ (-B) são calculadas em lote por minkowski_sum_convex_lote.
+
+    Returns:
+        Lista de Polygon na ordem [para cada parte de B: para cada parte de A].
+    """
+    fixas = [_coords_parte(parte) for parte in partes_fixas]
+    orbitais = [-_coords_parte(parte) + 0.0 for parte in partes_orbitais]
+    norm_fixas = [_normalizar_convexo(parte) for parte in fixas]
+    norm_orbitais = [_normalizar_convexo(parte) for parte in orbitais]
+    pares = [(a, b) for b in orbitais for a in fixas]
+    normalizados = [(na, nb) for nb in norm_orbitais for na in norm_fixas]
+    return minkowski_sum_convex_lote(pares, normalizados)
+
+
+def _aneis_interior_a_esquerda(poligono):
+    # Contorno anti-horário e buracos horários, sem vértices repetidos ou colineares.
+    poligono = orient(poligono.simplify(0), sign=1.0)
+    return [np.asarray(anel.coords, dtype=np.float64)[:-1]
+            for anel in [poligono.exterior, *poligono.interiors]]
+
+
+def _vertices_e_arestas(aneis):
+    vertices, entrada, saida, arestas_ini, arestas_fim = [], [], [], [], []
+    for anel in aneis:
+        anterior = _girar(anel, -1)
+        seguinte = _girar(anel, 1)
+        vertices.append(anel)
+        entrada.append(anel - anterior)
+        saida.append(seguinte - anel)
+        arestas_ini.append(anel)
+        arestas_fim.append(seguinte)
+    return (np.concatenate(vertices), np.concatenate(entrada), np.concatenate(saida),
+            np.concatenate(arestas_ini), np.concatenate(arestas_fim))
+
+
+def _segmentos_convolucao(vertices, entrada, saida, ini, fim, fechado_na_entrada=False):
+    # Pares (vértice convexo de um polígono, aresta do outro) cuja direção da
+    # aresta está no cone do vértice: convolução reduzida. Arestas paralelas
+    # precisam cair em um único lado, por isso o cone é (entrada, saída] para
+    # os vértices de A e [entrada, saída) para os de -B.
+    convexo = entrada[:, 0] * saida[:, 1] - entrada[:, 1] * saida[:, 0] > 0
+    v, u, w = vertices[convexo], entrada[convexo], saida[convexo]
+    d = fim - ini
+    giro_entrada = u[:, None, 0] * d[None, :, 1] - u[:, None, 1] * d[None, :, 0]
+    giro_saida = d[None, :, 0] * w[:, None, 1] - d[None, :, 1] * w[:, None, 0]
+    if fechado_na_entrada:
+        no_cone = (giro_entrada >= 0) & (giro_saida > 0)
+    else:
+        no_cone = (giro_entrada > 0) & (giro_saida >= 0)
+    iv, ie = np.nonzero(no_cone)
+    return np.stack((v[iv] + ini[ie], v[iv] + fim[ie]), axis=1)
+
+
+def _areas_sobreposicao(fixo, orbital, deslocamentos):
+    # Área de fixo ∩ (orbital + deslocamento) para cada deslocamento.
+    if len(deslocamentos) == 0:
+        return np.empty(0)
+    copias = np.full(len(deslocamentos), orbital, dtype=object)
+    n_coords = shapely.get_num_coordinates(orbital)
+    por_coord = np.repeat(deslocamentos, n_coords, axis=0)
+    transladados = shapely.transform(copias, lambda c: c + por_coord)
+    return shapely.area(shapely.intersection(fixo, transladados))
+
+
+def _amostras_interiores(faces):
+    """
+    Dois pontos interiores independentes por face do arranjo.
+
+    Um único ponto pode cair sobre uma aresta solta (encaixe exato dentro da
+    face), onde a sobreposição é nula; por isso a face é classificada pelo
+    maior valor entre o ponto de superfície e o centróide do seu maior
+    triângulo.
+
+    Args:
+        faces: Array de polígonos.
+
+    Returns:
+        Lista com dois arrays (n, 2) de pontos.
+    """
+    primeiros = shapely.get_coordinates(shapely.point_on_surface(faces))
+    segundos = np.empty_like(primeiros)
+    for i, face in enumerate(faces):
+        triangulos = shapely.get_parts(shapely.constrained_delaunay_triangles(face))
+        maior = triangulos[np.argmax(shapely.area(triangulos))]
+        segundos[i] = shapely.get_coordinates(shapely.centroid(maior))[0]
+    return [primeiros, segundos]
+
+
+def nfp_convolucao(pontos_fixo, pontos_orbital, buracos_fixo=None, buracos_orbital=None):
+    """
+    NFP exato de dois polígonos simples (com ou sem buracos) por convolução reduzida.
+
+    Os segmentos da convolução reduzida de A e -B contêm a fronteira de
+    A ⊕ (-B). Eles são nodados e poligonizados, e cada face é classificada
+    por um teste de sobreposição de área (B transladado para um ponto interior
+    da face sobrepõe A?). O NFP é a união das faces internas, preservando
+    buracos. Os pontos de encaixe são os vértices do NFP mais os vértices do
+    arranjo no interior do NFP em que B encaixa sem sobrepor A (encaixes
+    exatos que a união de partes convexas perde).
+
+    Args:
+        pontos_fixo: Vértices de A, já rotacionado.
+        pontos_orbital: Vértices de B, já rotacionado.
+        buracos_fixo: Lista opcional de anéis de buracos de A.
+        buracos_orbital: Lista opcional de anéis de buracos de B.
+
+    Returns:
+        Tupla (Polygon, lista de pontos de encaixe) ou (None, None) se o NFP
+        não for um único polígono (interior desconexo).
+    """
+    fixo = Polygon(pontos_fixo, buracos_fixo)
+    orbital = Polygon(pontos_orbital, buracos_orbital)
+    refletido = affinity.scale(orbital, xfact=-1, yfact=-1, origin=(0, 0))
+    A = _vertices_e_arestas(_aneis_interior_a_esquerda(fixo))
+    B = _vertices_e_arestas(_aneis_interior_a_esquerda(refletido))
+    segmentos = np.concatenate((
+        _segmentos_convolucao(A[0], A[1], A[2], B[3], B[4]),
+        _segmentos_convolucao(B[0], B[1], B[2], A[3], A[4], fechado_na_entrada=True),
+    ))
+    segmentos = segmentos[np.any(segmentos[:, 0] != segmentos[:, 1], axis=1)]
+    arranjo = shapely.union_all(shapely.linestrings(segmentos))
+    faces = np.asarray(shapely.get_parts(shapely.polygonize(shapely.get_parts(arranjo))))
+    if len(faces) == 0:
+        return None, None
+
+    tolerancia = 1e-9 * min(fixo.area, orbital.area)
+    internas = np.zeros(len(faces), dtype=bool)
+    for amostras in _amostras_interiores(faces):
+        internas |= _areas_sobreposicao(fixo, orbital, amostras) > tolerancia
+    nfp = shapely.union_all(faces[internas])
+    if not isinstance(nfp, Polygon) or nfp.is_empty:
+        return None, None
+
+    pontos = [tuple(p) for anel in [nfp.exterior, *nfp.interiors] for p in anel.coords[:-1]]
+    nos = np.unique(shapely.get_coordinates(arranjo), axis=0)
+    nos = nos[shapely.contains_xy(nfp, nos[:, 0], nos[:, 1])]
+    encaixes = nos[_areas_sobreposicao(fixo, orbital, nos) <= tolerancia]
+    pontos.extend(map(tuple, encaixes.tolist()))
+    return nfp, pontos
+
+
 def combinar_poligonos(poligonos):
     """
     Recebe uma lista de polígonos e retorna um único polígono que representa
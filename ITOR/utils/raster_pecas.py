@@ -0,0 +1,148 @@
+import math
+import numpy as np
+import shapely
+from scipy.signal import convolve2d
+from shapely.geometry import Polygon
+
+
+class MotorRaster():
+    """
+    Motor aproximado de posicionamento sobre uma grade de células.
+
+    A chapa e cada peça rotacionada são discretizadas em células de lado
+    tamanho_celula. Uma célula da peça é marcada se o interior da peça (com a
+    folga entre peças, quando houver) intersecta o interior da célula, então a
+    aproximação é conservadora: posições sem sobreposição de máscaras também
+    são viáveis na geometria exata. As máscaras das peças e as máscaras de NFP
+    (posições proibidas de B em relação a A, obtidas por convolução) são
+    calculadas uma vez por (tipo, grau) e guardadas.
+
+    Args:
+        geometria: GeometriaPecas com as rotações de cada tipo.
+        tamanho_celula: Lado da célula, nas unidades da instância.
+        folga_pecas: Distância mínima entre peças.
+        folga_borda: Distância mínima entre as peças e a borda da chapa.
+    """
+
+    def __init__(self, geometria, tamanho_celula, folga_pecas=0, folga_borda=0):
+        self.geometria = geometria
+        self.celula = tamanho_celula
+        self.folga_pecas = folga_pecas
+        self.folga_borda = folga_borda
+        self.mascaras = {}
+        self.mascaras_nfp = {}
+
+    def mascara(self, tipo, grau, folga=0):
+        """
+        Máscara booleana da peça, alinhada ao canto inferior esquerdo do seu
+        retângulo envolvente e estendida por ceil(folga / celula) células em
+        cada direção.
+
+        Returns:
+            Tupla (mascara, margem) com a máscara (linhas = y, colunas = x) e o
+            número de células de extensão.
+        """
+        chave = (tipo, grau, folga)
+
+        if chave not in self.mascaras:
+            minx, miny, maxx, maxy = self.geometria.limites[tipo, grau]
+            poligono = Polygon(self.geometria.coordenadas[tipo, grau])
+
+            if folga > 0:
+                poligono = poligono.buffer(folga)
+            margem = math.ceil(folga / self.celula - 1e-9)
+            largura = max(1, math.ceil((maxx - minx) / self.celula - 1e-9)) + 2 * margem
+            altura = max(1, math.ceil((maxy - miny) / self.celula - 1e-9)) + 2 * margem
+            xs = minx + (np.arange(largura) - margem) * self.celula
+            ys = miny + (np.arange(altura) - margem) * self.celula
+            x0, y0 = np.meshgrid(xs, ys)
+            celulas = shapely.box(x0, y0, x0 + self.celula, y0 + self.celula)
+            shapely.prepare(poligono)
+            mascara = shapely.relate_pattern(poligono, celulas, 'T********')
+            self.mascaras[chave] = (mascara, margem)
+        return self.mascaras[chave]
+
+    def mascara_nfp(self, tipoA, grauA, tipoB, grauB):
+        """
+        Deslocamentos (em células) de B em relação a A que causam sobreposição.
+
+        Returns:
+            Tupla (mascara, dy, dx): a posição (i, j) da máscara corresponde ao
+            deslocamento (i + dy, j + dx) entre os cantos das duas peças.
+        """
+        chave = (tipoA, grauA, tipoB, grauB)
+
+        if chave not in self.mascaras_nfp:
+            mascaraA, margem = self.mascara(tipoA, grauA, self.folga_pecas)
+            mascaraB, _ = self.mascara(tipoB, grauB)
+            nfp = convolve2d(mascaraA.astype(np.int32), mascaraB[::-1, ::-1].astype(np.int32)) > 0
+            self.mascaras_nfp[chave] = (nfp, -(mascaraB.shape[0] - 1) - margem, -(mascaraB.shape[1] - 1) - margem)
+        return self.mascaras_nfp[chave]
+
+    def grade(self, base, altura):
+        util = self.folga_borda
+        return int((altura - 2 * util) // self.celula), int((base - 2 * util) // self.celula)
+
+    def celula_de(self, tipo, grau, x, y):
+        minx, miny, _, _ = self.geometria.limites[tipo, grau]
+        return (round((y + miny - self.folga_borda) / self.celula),
+                round((x + minx - self.folga_borda) / self.celula))
+
+    def proibidas(self, tipo, grau, base, altura, colocadas, anterior=None):
+        """
+        Mapa das células onde o canto da peça (tipo, grau) não pode ficar.
+
+        Args:
+            colocadas: Lista (tipo, grau, x, y) das peças já posicionadas.
+            anterior: Tupla (n, mapa) com o mapa já calculado para as n
+                primeiras peças de colocadas, que é estendido em vez de
+                recalculado.
+
+        Returns:
+            Matriz booleana (linhas = y, colunas = x) das posições do canto da
+            peça, ou None se a peça não cabe na chapa nessa rotação.
+        """
+        linhas, colunas = self.grade(base, altura)
+        mascara, _ = self.mascara(tipo, grau)
+        linhas -= mascara.shape[0] - 1
+        colunas -= mascara.shape[1] - 1
+
+        if linhas <= 0 or colunas <= 0:
+            return None
+
+        if anterior is not None and anterior[1] is not None:
+            inicio, mapa = anterior[0], anterior[1].copy()
+        else:
+            inicio, mapa = 0, np.zeros((linhas, colunas), dtype=bool)
+        for tipoA, grauA, x, y in colocadas[inicio:]:
+            nfp, dy, dx = self.mascara_nfp(tipoA, grauA, tipo, grau)
+            i, j = self.celula_de(tipoA, grauA, x, y)
+            i0, j0 = i + dy, j + dx
+            a0, b0 = max(i0, 0), max(j0, 0)
+            a1, b1 = min(i0 + nfp.shape[0], linhas), min(j0 + nfp.shape[1], colunas)
+
+            if a0 < a1 and b0 < b1:
+                mapa[a0:a1, b0:b1] |= nfp[a0 - i0:a1 - i0, b0 - j0:b1 - j0]
+        return mapa
+
+    def posicoes(self, tipo, grau, proibidas):
+        """
+        Posições candidatas da peça: as células livres na borda da região
+        livre, convertidas para o deslocamento (x, y) usado por acao().
+
+        Returns:
+            Tupla (posicoes, area) com a lista de (x, y) e a área da região
+            livre.
+        """
+
+        if proibidas is None:
+            return [], 0
+        livres = ~proibidas
+        vizinhas = np.zeros((livres.shape[0] + 2, livres.shape[1] + 2), dtype=bool)
+        vizinhas[1:-1, 1:-1] = livres
+        interior = vizinhas[:-2, 1:-1] & vizinhas[2:, 1:-1] & vizinhas[1:-1, :-2] & vizinhas[1:-1, 2:]
+        linhas, colunas = np.nonzero(livres & ~interior)
+        minx, miny, _, _ = self.geometria.limites[tipo, grau]
+        xs = self.folga_borda + colunas * self.celula - minx
+        ys = self.folga_borda + linhas * self.celula - miny
+        return list(zip(xs.tolist(), ys.tolist())), int(livres.sum()) * self.celula ** 2
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+REGRAS = ('BL', 'LB', 'BR', 'RB', 'UL', 'LU', 'UR', 'RU', 'NC', 'NCG', 'NCNFP')
+
+
+def primeiro_minimo(primaria, secundaria=None):
+    """
+    Índice da primeira posição com a menor chave (primaria, secundaria).
+
+    Equivale a sorted(range(n), key=...)[0]: em caso de empate, vence a
+    posição que aparece primeiro, como na ordenação estável do Python.
+    """
+    empatadas = np.flatnonzero(primaria == primaria.min())
+
+    if secundaria is None or len(empatadas) == 1:
+        return int(empatadas[0])
+    return int(empatadas[np.argmin(secundaria[empatadas])])
+
+
+def avaliar_regras(posicoes, centro_chapa, centro_layout=None):
+    """
+    Avalia de uma vez as 11 regras de posicionamento sobre as posições viáveis.
+
+    As posições são convertidas em um array uma única vez e cada regra se
+    reduz a um mínimo lexicográfico (ou a uma menor distância), em vez de
+    ordenar a lista inteira por regra.
+
+    Args:
+        posicoes: Lista de posições (x, y) devolvida por feasible().
+        centro_chapa: Centro da chapa, usado por NC (e por NCG sem peças).
+        centro_layout: Média dos centróides das peças posicionadas, usada por
+            NCG; None se a chapa está vazia.
+
+    Returns:
+        Dicionário {regra: posição} com o próprio elemento de posicoes
+        escolhido por cada regra, ou [] para todas se não há posições.
+    """
+
+    if not posicoes:
+        return dict.fromkeys(REGRAS, [])
+    pontos = np.asarray(posicoes, dtype=float)
+    x, y = pontos[:, 0], pontos[:, 1]
+    soma_x = 0
+    soma_y = 0
+    for pos in posicoes:
+        soma_x += pos[0]
+        soma_y += pos[1]
+    centro_nfp = (soma_x / len(posicoes), soma_y / len(posicoes))
+
+    if centro_layout is None:
+        centro_layout = centro_chapa
+    indices = {
+        'BL': primeiro_minimo(x, y),
+        'LB': primeiro_minimo(y, x),
+        'BR': primeiro_minimo(-x, y),
+        'RB': primeiro_minimo(y, -x),
+        'UL': primeiro_minimo(x, -y),
+        'LU': primeiro_minimo(-y, x),
+        'UR': primeiro_minimo(-x, -y),
+        'RU': primeiro_minimo(-y, -x),
+        'NC': primeiro_minimo(np.hypot(x - centro_chapa[0], y - centro_chapa[1])),
+        'NCG': primeiro_minimo(np.hypot(x - centro_layout[0], y - centro_layout[1])),
+        'NCNFP': primeiro_minimo(np.hypot(x - centro_nfp[0], y - centro_nfp[1])),
+    }
+    return {regra: posicoes[indice] for regra, indice in indices.items()}